@@ -0,0 +1,211 @@
+import contextvars
+import json
+import logging
+import math
+from typing import Callable
+
+from app import config
+from app.batcher import batcher
+from app.executor import inference_executor
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+shed_requests = registry.counter(
+    "admission_shed_total", "Requests rejected by admission control by route and reason", ("path", "reason")
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class Ticket:
+    # One admitted request. It starts out holding one row; handlers that
+    # learn the real row count after parsing the body call admit_rows().
+    def __init__(self, controller: "AdmissionController", path: str):
+        self.controller = controller
+        self.path = path
+        self.rows = 1
+
+    def admit_rows(self, rows: int):
+        extra = rows - self.rows
+        if extra > 0:
+            self.controller.add_rows(self, extra)
+
+    def release(self):
+        self.controller.release(self)
+
+
+class _NoTicket:
+    def admit_rows(self, rows: int):
+        pass
+
+
+NO_TICKET = _NoTicket()
+
+_current_ticket: contextvars.ContextVar = contextvars.ContextVar("admission_ticket", default=NO_TICKET)
+
+
+def current_ticket() -> Ticket | _NoTicket:
+    return _current_ticket.get()
+
+
+class AdmissionController:
+    # Bounds the work the server has accepted. Requests and rows in flight
+    # each have a budget (429 once exceeded), and while the oldest work
+    # queued for inference has waited longer than the delay budget, new
+    # requests are shed with 503. 0 disables a limit.
+    def __init__(
+        self,
+        max_requests: int = 64,
+        max_rows: int = 4096,
+        max_queue_delay_ms: float = 100.0,
+        delay_sources: tuple[Callable[[], float], ...] = (),
+    ):
+        self.max_requests = max_requests
+        self.max_rows = max_rows
+        self.max_queue_delay = max_queue_delay_ms / 1000
+        self.delay_sources = delay_sources
+        self.requests = 0
+        self.rows = 0
+        self.admitted = 0
+        self.shed: dict[str, int] = {}
+
+    def queue_delay(self) -> float:
+        return max((source() for source in self.delay_sources), default=0.0)
+
+    def retry_after(self) -> int:
+        # Whole seconds, as the header requires; roughly how long the
+        # current backlog takes to drain
+        return max(1, math.ceil(self.queue_delay() * 2))
+
+    def _reject(self, path: str, reason: str, status_code: int, detail: str):
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        shed_requests.inc(path, reason)
+        raise AdmissionRejected(reason, status_code, self.retry_after(), detail)
+
+    def admit(self, path: str) -> Ticket:
+        if self.max_requests and self.requests >= self.max_requests:
+            self._reject(path, "concurrency", 429, f"Too many requests in flight ({self.requests})")
+        # The delay is the age of work still queued, so it falls back to 0
+        # as soon as the queue drains, whatever else is in flight
+        if self.max_queue_delay and self.requests and self.queue_delay() > self.max_queue_delay:
+            self._reject(
+                path, "queue_delay", 503,
+                f"Server overloaded, inference queue delay {self.queue_delay() * 1000:.0f}ms"
+            )
+        if self.max_rows and self.rows + 1 > self.max_rows:
+            self._reject(path, "rows", 429, f"Too many rows in flight ({self.rows})")
+
+        self.requests += 1
+        self.rows += 1
+        self.admitted += 1
+        return Ticket(self, path)
+
+    def add_rows(self, ticket: Ticket, rows: int):
+        # A single batch larger than the whole budget still runs when it is
+        # the only work in flight, rather than being rejected forever
+        if self.max_rows and self.rows + rows > self.max_rows and self.rows > ticket.rows:
+            self._reject(ticket.path, "rows", 429, f"Too many rows in flight ({self.rows})")
+        self.rows += rows
+        ticket.rows += rows
+
+    def release(self, ticket: Ticket):
+        self.requests -= 1
+        self.rows -= ticket.rows
+        ticket.rows = 0
+
+    def get_stats(self) -> dict:
+        return {
+            "in_flight_requests": self.requests,
+            "in_flight_rows": self.rows,
+            "max_requests": self.max_requests,
+            "max_rows": self.max_rows,
+            "queue_delay_ms": round(self.queue_delay() * 1000, 3),
+            "max_queue_delay_ms": self.max_queue_delay * 1000,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+class AdmissionControl:
+    # Pure ASGI and in front of routing, so a shed request costs no body
+    # read or validation. Only paths under the given prefixes are
+    # admitted; health probes, metrics and everything else always get
+    # through, which keeps /health answering while prediction traffic is
+    # being shed.
+    def __init__(self, app, controller: AdmissionController, prefixes: tuple[str, ...]):
+        self.app = app
+        self.controller = controller
+        self.prefixes = prefixes
+        self._routes: set[str] | None = None
+
+    def _label(self, scope) -> str:
+        # Metric label: the path itself for fixed routes, otherwise the
+        # matching prefix, so arbitrary URLs cannot create new series
+        if self._routes is None:
+            routes = getattr(scope.get("app"), "routes", ())
+            self._routes = {route.path for route in routes if "{" not in getattr(route, "path", "{")}
+        path = scope["path"]
+        if path in self._routes:
+            return path
+        return next(prefix for prefix in self.prefixes if path.startswith(prefix))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            ticket = self.controller.admit(self._label(scope))
+        except AdmissionRejected as e:
+            await send_rejection(send, e)
+            return
+
+        token = _current_ticket.set(ticket)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_ticket.reset(token)
+            ticket.release()
+
+
+async def send_rejection(send, rejection: AdmissionRejected):
+    body = json.dumps({"detail": rejection.detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": rejection.status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(rejection.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+admission_controller = AdmissionController(
+    max_requests=config.ADMISSION_MAX_REQUESTS,
+    max_rows=config.ADMISSION_MAX_ROWS,
+    max_queue_delay_ms=config.ADMISSION_MAX_QUEUE_DELAY_MS,
+    delay_sources=(inference_executor.queue_delay, batcher.queue_delay),
+)
+
+registry.gauge(
+    "admission_in_flight_requests", "Prediction requests admitted and not yet finished",
+    collect=lambda: admission_controller.requests
+)
+registry.gauge(
+    "admission_in_flight_rows", "Rows in admitted prediction requests",
+    collect=lambda: admission_controller.rows
+)
+registry.gauge(
+    "admission_queue_delay_seconds", "Age of the oldest work queued for inference, compared to the admission budget",
+    collect=admission_controller.queue_delay
+)
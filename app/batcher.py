@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from app import config
+from app.executor import InferenceExecutor, inference_executor
+from app.deadlines import Deadline, DeadlineExceeded, deadline_dropped
+from app.metrics import inference_batch_rows
+from app.predict import ModelService, model_service
+
+logger = logging.getLogger(__name__)
+
+
+class BatchStats:
+    def __init__(self):
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_size = 0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+
+    def record(self, batch_size: int, queue_delays: list[float]):
+        self.batches += 1
+        self.rows += batch_size
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        self.total_queue_delay += sum(queue_delays)
+        self.max_queue_delay = max(self.max_queue_delay, max(queue_delays))
+
+    def as_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "mean_queue_delay_ms": 1000 * self.total_queue_delay / self.rows if self.rows else 0.0,
+            "max_queue_delay_ms": 1000 * self.max_queue_delay,
+        }
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        service: ModelService,
+        executor: InferenceExecutor,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 2.0,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.service = service
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = BatchStats()
+        self._queue: asyncio.Queue | None = None
+        # Enqueue times of rows put on _queue, oldest first; trimmed to the
+        # queue's length whenever rows have been taken off it
+        self._enqueued: deque[float] = deque()
+        self._worker: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        if self.is_running():
+            return
+
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:g})"
+        )
+
+    async def stop(self):
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        while not self._queue.empty():
+            _, future, _, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+        logger.info("Micro-batcher stopped")
+
+    async def predict(self, features: list[float], deadline: Deadline | None = None) -> tuple[str, float, dict]:
+        if not self.is_running():
+            raise RuntimeError("Micro-batcher is not running. Call start() first.")
+
+        future = asyncio.get_running_loop().create_future()
+        enqueued = time.perf_counter()
+        self._enqueued.append(enqueued)
+        await self._queue.put((features, future, enqueued, deadline))
+        return await future
+
+    def queue_delay(self) -> float:
+        # How long the oldest row not yet collected into a batch has waited
+        self._trim()
+        return time.perf_counter() - self._enqueued[0] if self._enqueued else 0.0
+
+    def _trim(self):
+        # The queue is FIFO, so the rows still in it are the newest qsize()
+        waiting = self._queue.qsize() if self._queue is not None else 0
+        while len(self._enqueued) > waiting:
+            self._enqueued.popleft()
+
+    async def _collect(self) -> list[tuple]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        self._trim()
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+
+            started = time.perf_counter()
+            batch = [item for item in batch if not self._expired(item) and not item[1].done()]
+            if not batch:
+                continue
+
+            self.stats.record(len(batch), [started - enqueued for _, _, enqueued, _ in batch])
+            inference_batch_rows.observe(len(batch))
+
+            # Dispatch without awaiting so the next batch can be collected while
+            # this one runs on the executor.
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _expired(self, item: tuple) -> bool:
+        # Rows whose caller's deadline has already passed never reach the model
+        _, future, _, deadline = item
+        if deadline is None or not deadline.expired():
+            return False
+        deadline_dropped.inc("queue")
+        if not future.done():
+            future.set_exception(DeadlineExceeded("queue"))
+        return True
+
+    async def _dispatch(self, batch: list[tuple]):
+        # The batch is only worth starting while someone is still waiting:
+        # if every row has a deadline, the executor drops the batch once the
+        # latest of them has passed.
+        deadlines = [deadline for _, _, _, deadline in batch]
+        deadline = None if None in deadlines else max(deadlines, key=lambda d: d.expires_at)
+        try:
+            results = await self.executor.run(
+                self.service.predict_cached, [features for features, _, _, _ in batch], deadline=deadline
+            )
+        except Exception as e:
+            if not isinstance(e, DeadlineExceeded):
+                logger.error(f"Micro-batch of {len(batch)} failed: {e}")
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+batcher = MicroBatcher(
+    model_service,
+    inference_executor,
+    max_batch_size=config.BATCH_MAX_SIZE,
+    max_wait_ms=config.BATCH_MAX_WAIT_MS,
+)
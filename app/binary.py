@@ -0,0 +1,115 @@
+import struct
+
+import numpy as np
+
+from app.schemas import FEATURE_NAMES
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MATRIX_MEDIA_TYPE = "application/x-iris-matrix"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# magic, version, dtype code, columns, rows; 16 bytes keeps the payload 8-byte aligned
+HEADER = struct.Struct("<4sBBHQ")
+MAGIC = b"IRIS"
+VERSION = 1
+DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f8")}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+class UnsupportedMediaType(Exception):
+    pass
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def decode_matrix(body: bytes) -> np.ndarray:
+    if len(body) < HEADER.size:
+        raise BinaryFormatError(f"Body shorter than the {HEADER.size}-byte header")
+
+    magic, version, dtype_code, n_cols, n_rows = HEADER.unpack_from(body)
+    if magic != MAGIC:
+        raise BinaryFormatError(f"Bad magic {magic!r}, expected {MAGIC!r}")
+    if version != VERSION:
+        raise BinaryFormatError(f"Unsupported format version {version}")
+    if dtype_code not in DTYPES:
+        raise BinaryFormatError(f"Unsupported dtype code {dtype_code}, expected one of {sorted(DTYPES)}")
+    if n_cols != len(FEATURE_NAMES):
+        raise BinaryFormatError(f"Expected {len(FEATURE_NAMES)} columns, got {n_cols}")
+
+    dtype = DTYPES[dtype_code]
+    expected = HEADER.size + n_rows * n_cols * dtype.itemsize
+    if len(body) != expected:
+        raise BinaryFormatError(f"Body is {len(body)} bytes, header describes {expected}")
+
+    # A read-only view over the request body: no per-row objects, no copy
+    return np.frombuffer(body, dtype=dtype, count=n_rows * n_cols, offset=HEADER.size).reshape(n_rows, n_cols)
+
+
+def encode_matrix(matrix: np.ndarray) -> bytes:
+    matrix = np.ascontiguousarray(matrix, dtype="<f8")
+    header = HEADER.pack(MAGIC, VERSION, DTYPE_CODES[matrix.dtype], matrix.shape[1], matrix.shape[0])
+    return header + matrix.tobytes()
+
+
+def result_matrix(predictions: np.ndarray, confidences: np.ndarray, probabilities: np.ndarray) -> np.ndarray:
+    return np.column_stack([predictions.astype(np.float64), confidences, probabilities])
+
+
+def result_columns(class_names: list[str]) -> list[str]:
+    return ["class_index", "confidence", *class_names]
+
+
+def decode_arrow(body: bytes) -> np.ndarray:
+    if pa is None:
+        raise UnsupportedMediaType("Arrow IPC requires pyarrow, which is not installed")
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise BinaryFormatError(f"Invalid Arrow IPC stream: {e}")
+
+    missing = [name for name in FEATURE_NAMES if name not in table.column_names]
+    if missing:
+        raise BinaryFormatError(f"Missing feature columns: {missing}")
+
+    columns = []
+    for name in FEATURE_NAMES:
+        column = table.column(name)
+        if column.null_count:
+            raise BinaryFormatError(f"Column '{name}' contains nulls")
+        if not pa.types.is_floating(column.type) and not pa.types.is_integer(column.type):
+            raise BinaryFormatError(f"Column '{name}' must be numeric, got {column.type}")
+        columns.append(column.to_numpy())
+
+    return np.column_stack(columns)
+
+
+def encode_arrow(
+    class_names: list[str],
+    predictions: np.ndarray,
+    confidences: np.ndarray,
+    probabilities: np.ndarray
+) -> bytes:
+    table = pa.table({
+        "predicted_class": pa.DictionaryArray.from_arrays(
+            pa.array(predictions.astype(np.int32)), pa.array(class_names)
+        ),
+        "class_index": pa.array(predictions),
+        "confidence": pa.array(confidences),
+        **{f"prob_{name}": pa.array(probabilities[:, i]) for i, name in enumerate(class_names)},
+    })
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,69 @@
+import numpy as np
+
+from app.responses import loads
+from app.schemas import FEATURE_NAMES, FEATURE_MIN, FEATURE_MAX
+
+
+class ColumnarValidationError(ValueError):
+    pass
+
+
+def parse_columnar(body: bytes) -> np.ndarray:
+    try:
+        payload = loads(body)
+    except ValueError as e:
+        raise ColumnarValidationError(f"Invalid JSON: {e}")
+
+    if not isinstance(payload, dict):
+        raise ColumnarValidationError("Body must be an object of feature columns")
+
+    missing = [name for name in FEATURE_NAMES if name not in payload]
+    if missing:
+        raise ColumnarValidationError(f"Missing feature columns: {missing}")
+
+    columns = []
+    for name in FEATURE_NAMES:
+        values = payload[name]
+        if not isinstance(values, list):
+            raise ColumnarValidationError(f"Column '{name}' must be an array of numbers")
+        # Exact types, as the streaming parser checks them: bool is a
+        # subclass of int and would otherwise pass as 0.0 or 1.0
+        if not set(map(type, values)) <= {float, int}:
+            raise ColumnarValidationError(f"Column '{name}' must contain only numbers")
+        columns.append(np.asarray(values, dtype=np.float64))
+
+    lengths = {len(column) for column in columns}
+    if len(lengths) != 1:
+        raise ColumnarValidationError(
+            f"Feature columns must have equal lengths, got {dict(zip(FEATURE_NAMES, map(len, columns)))}"
+        )
+
+    X = np.column_stack(columns)
+    validate_bounds(X)
+    return X
+
+
+def validate_bounds(X: np.ndarray):
+    # NaN fails both comparisons, so it is rejected along with out-of-range values
+    invalid = ~((X >= FEATURE_MIN) & (X <= FEATURE_MAX))
+    if invalid.any():
+        row, col = np.argwhere(invalid)[0]
+        raise ColumnarValidationError(
+            f"{int(invalid.sum())} values outside [{FEATURE_MIN:g}, {FEATURE_MAX:g}]; "
+            f"first at row {int(row)}, column '{FEATURE_NAMES[col]}' ({float(X[row, col])!r})"
+        )
+
+
+def columnar_result(
+    class_names: list[str],
+    predictions: np.ndarray,
+    confidences: np.ndarray,
+    probabilities: np.ndarray
+) -> dict:
+    return {
+        "classes": class_names,
+        "predicted_class": np.asarray(class_names, dtype=object).take(predictions).tolist(),
+        "class_index": predictions,
+        "confidence": confidences,
+        "probabilities": probabilities,
+    }
@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+TREE_LEAF = -1
+CHUNK_SIZE = 1024
+ARRAY_FIELDS = ("feature", "threshold", "children", "value", "roots", "classes")
+
+FOREST_PATH = Path("model/iris_forest.bin")
+FOREST_FORMAT_VERSION = 1
+# magic, format version, JSON header length; arrays follow at 64-byte aligned offsets
+FOREST_PREAMBLE = struct.Struct("<8sII")
+FOREST_MAGIC = b"IRISFRST"
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class CompiledForest:
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        classes: np.ndarray,
+        max_depth: int,
+        n_features: int,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node + went_left] gives the next node in one gather
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        offsets = np.cumsum([0] + [est.tree_.node_count for est in model.estimators_])
+        n_nodes = int(offsets[-1])
+        n_classes = len(model.classes_)
+
+        feature = np.zeros(n_nodes, dtype=np.intp)
+        threshold = np.zeros(n_nodes, dtype=np.float64)
+        left = np.zeros(n_nodes, dtype=np.intp)
+        right = np.zeros(n_nodes, dtype=np.intp)
+        value = np.zeros((n_nodes, n_classes), dtype=np.float64)
+
+        for i, est in enumerate(model.estimators_):
+            tree = est.tree_
+            start, stop = int(offsets[i]), int(offsets[i + 1])
+            nodes = np.arange(start, stop)
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Leaves point back at themselves so every sample can take exactly
+            # max_depth steps without per-level masking.
+            feature[start:stop] = np.where(is_leaf, 0, tree.feature)
+            threshold[start:stop] = np.where(is_leaf, 0.0, tree.threshold)
+            left[start:stop] = np.where(is_leaf, nodes, tree.children_left + start)
+            right[start:stop] = np.where(is_leaf, nodes, tree.children_right + start)
+
+            proba = tree.value[:, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            value[start:stop] = proba / normalizer
+
+        return cls(
+            feature=feature,
+            threshold=threshold,
+            children=np.stack([right, left], axis=1).ravel(),
+            value=value,
+            roots=offsets[:-1].astype(np.intp),
+            classes=np.asarray(model.classes_),
+            max_depth=max(est.tree_.max_depth for est in model.estimators_),
+            n_features=int(model.n_features_in_),
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], max_depth: int, n_features: int) -> "CompiledForest":
+        return cls(**{name: arrays[name] for name in ARRAY_FIELDS}, max_depth=max_depth, n_features=n_features)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "value": self.value,
+            "roots": self.roots,
+            "classes": self.classes_,
+        }
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["CompiledForest", dict]:
+        # The arrays are read-only views over a shared file mapping: nothing
+        # is copied or unpickled, and every process that maps the file reads
+        # the same physical pages from the page cache.
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, header_size = FOREST_PREAMBLE.unpack_from(data)
+        if magic != FOREST_MAGIC:
+            raise ValueError(f"{path} is not a compiled forest artifact")
+
+        header = json.loads(bytes(data[FOREST_PREAMBLE.size:FOREST_PREAMBLE.size + header_size]))
+        arrays = {
+            name: np.ndarray(tuple(shape), dtype=dtype, buffer=data, offset=offset)
+            for name, dtype, shape, offset in header["arrays"]
+        }
+        forest = cls.from_arrays(arrays, header["max_depth"], header["n_features"])
+        info = {"format_version": version, "model_sha256": header["model_sha256"]}
+        return forest, info
+
+    def save(self, path: Path, model_sha256: str):
+        arrays = self.to_arrays()
+        header = {
+            "model_sha256": model_sha256,
+            "max_depth": int(self.max_depth),
+            "n_features": int(self.n_features_in_),
+            "arrays": [],
+        }
+
+        # Offsets depend on the header length, so lay out with a generous
+        # placeholder first and settle once the JSON size is known.
+        data_start = 0
+        while True:
+            offset = data_start
+            header["arrays"] = []
+            for name, array in arrays.items():
+                offset = _align(offset)
+                header["arrays"].append((name, array.dtype.str, array.shape, offset))
+                offset += array.nbytes
+            encoded = json.dumps(header).encode()
+            needed = _align(FOREST_PREAMBLE.size + len(encoded))
+            if needed <= data_start:
+                break
+            data_start = needed
+
+        # Running servers may have the old file mapped; truncating it in place
+        # would fault their reads, so write a new file and rename over it.
+        path = Path(path)
+        partial = path.with_name(path.name + ".tmp")
+        with open(partial, "wb") as f:
+            f.write(FOREST_PREAMBLE.pack(FOREST_MAGIC, FOREST_FORMAT_VERSION, len(encoded)))
+            f.write(encoded)
+            for (_, _, _, start), array in zip(header["arrays"], arrays.values()):
+                f.write(b"\0" * (start - f.tell()))
+                f.write(np.ascontiguousarray(array).tobytes())
+        os.replace(partial, path)
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.children[1::2]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.children[0::2]
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        # sklearn evaluates splits on float32 inputs; match it so samples that
+        # sit exactly on a threshold take the same branch.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        return self.traverse(X)
+
+    def traverse(self, X: np.ndarray) -> np.ndarray:
+        # Walks the trees on X exactly as given: no float32 rounding and no
+        # input checks, so callers can probe cell boundaries or infinities.
+        if X.shape[0] <= CHUNK_SIZE:
+            return self._apply_chunk(X)
+
+        return np.concatenate([
+            self._apply_chunk(X[start:start + CHUNK_SIZE])
+            for start in range(0, X.shape[0], CHUNK_SIZE)
+        ])
+
+    def _apply_chunk(self, X: np.ndarray) -> np.ndarray:
+        flat = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(X.shape[0], dtype=np.intp) * X.shape[1])[:, None]
+
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            values = flat.take(row_offsets + self.feature.take(nodes))
+            went_left = values <= self.threshold.take(nodes)
+            nodes = self.children.take(2 * nodes + went_left)
+
+        return nodes
+
+    def leaf_proba(self, leaves: np.ndarray) -> np.ndarray:
+        return self.value.take(leaves, axis=0).sum(axis=1) / self.n_trees
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.leaf_proba(self.apply(X))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+
+def main():
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Convert a trained forest into a memory-mappable artifact")
+    parser.add_argument("--model", type=Path, default=Path("model/iris_model.joblib"))
+    parser.add_argument("--output", type=Path, default=FOREST_PATH)
+    args = parser.parse_args()
+
+    forest = CompiledForest.from_sklearn(joblib.load(args.model))
+    forest.save(args.output, hashlib.sha256(args.model.read_bytes()).hexdigest())
+
+    print(f"Trees: {forest.n_trees}, nodes: {len(forest.feature)}, max depth: {forest.max_depth}")
+    print(f"Saved forest artifact to {args.output} ({args.output.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
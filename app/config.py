@@ -0,0 +1,70 @@
+import os
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "sklearn")
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "0"))
+WORKER_MAX_ROWS = int(os.getenv("WORKER_MAX_ROWS", "4096"))
+WORKER_TIMEOUT_SECONDS = float(os.getenv("WORKER_TIMEOUT_SECONDS", "30"))
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_QUANTUM = float(os.getenv("PREDICTION_CACHE_QUANTUM", "0"))
+
+BATCHING_ENABLED = _get_bool("BATCHING_ENABLED", True)
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "256"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "2"))
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "64"))
+
+FAST_RESPONSES = _get_bool("FAST_RESPONSES", True)
+
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "4096"))
+
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_CHUNK_ROWS = int(os.getenv("JOB_CHUNK_ROWS", "65536"))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "86400"))
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "1000"))
+
+WARMUP_ENABLED = _get_bool("WARMUP_ENABLED", True)
+WARMUP_ROUND_SIZE = int(os.getenv("WARMUP_ROUND_SIZE", "200"))
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "256"))
+WARMUP_MIN_ROUNDS = int(os.getenv("WARMUP_MIN_ROUNDS", "3"))
+WARMUP_TOLERANCE = float(os.getenv("WARMUP_TOLERANCE", "0.2"))
+WARMUP_MAX_SECONDS = float(os.getenv("WARMUP_MAX_SECONDS", "30"))
+
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+MODELS_DIR = os.getenv("MODELS_DIR", "models")
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "512"))
+
+SHADOW_MODEL = os.getenv("SHADOW_MODEL", "")
+SHADOW_FRACTION = float(os.getenv("SHADOW_FRACTION", "0.1"))
+SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", "256"))
+SHADOW_QUEUE_ROWS = int(os.getenv("SHADOW_QUEUE_ROWS", "8192"))
+SHADOW_MAX_BUSY = float(os.getenv("SHADOW_MAX_BUSY", "0.25"))
+
+METRICS_ENABLED = _get_bool("METRICS_ENABLED", True)
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+ADMISSION_ENABLED = _get_bool("ADMISSION_ENABLED", True)
+ADMISSION_PATHS = tuple(p.strip() for p in os.getenv("ADMISSION_PATHS", "/predict,/models/").split(",") if p.strip())
+ADMISSION_MAX_REQUESTS = int(os.getenv("ADMISSION_MAX_REQUESTS", "64"))
+ADMISSION_MAX_ROWS = int(os.getenv("ADMISSION_MAX_ROWS", "4096"))
+ADMISSION_MAX_QUEUE_DELAY_MS = float(os.getenv("ADMISSION_MAX_QUEUE_DELAY_MS", "100"))
+
+DEFAULT_REQUEST_TIMEOUT_MS = float(os.getenv("DEFAULT_REQUEST_TIMEOUT_MS", "0"))
+INFERENCE_CHUNK_ROWS = int(os.getenv("INFERENCE_CHUNK_ROWS", "4096"))
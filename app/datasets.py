@@ -0,0 +1,247 @@
+import csv
+import io
+import itertools
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from app.responses import dumps
+from app.schemas import FEATURE_NAMES, FEATURE_MIN, FEATURE_MAX
+from app.streaming import parse_lines
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+FORMATS = ("csv", "ndjson", "parquet", "npy")
+RESULT_FORMATS = ("csv", "ndjson", "parquet")
+COUNT_BLOCK_BYTES = 1 << 20
+
+
+class DatasetError(ValueError):
+    pass
+
+
+def detect_format(path: Path, fmt: str | None = None) -> str:
+    if fmt is None:
+        suffix = Path(path).suffix.lower().lstrip(".")
+        fmt = {"jsonl": "ndjson", "json": "ndjson", "pq": "parquet"}.get(suffix, suffix)
+    if fmt not in FORMATS:
+        raise DatasetError(f"Unsupported format '{fmt}', expected one of {FORMATS}")
+    if fmt == "parquet" and pq is None:
+        raise DatasetError("Parquet support requires pyarrow, which is not installed")
+    return fmt
+
+
+def _count_newlines(path: Path) -> int:
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(COUNT_BLOCK_BYTES):
+            count += block.count(b"\n")
+            last = block[-1:]
+    return count + (last != b"\n")
+
+
+def _csv_columns(header: list[str]) -> list[int] | None:
+    # A header is any first line that does not parse as numbers. Feature
+    # columns are found by name; headerless files use the first four columns.
+    try:
+        [float(value) for value in header]
+        return None
+    except ValueError:
+        pass
+
+    names = [name.strip().lower().replace(" (cm)", "").replace(" ", "_") for name in header]
+    missing = [name for name in FEATURE_NAMES if name not in names]
+    if missing:
+        raise DatasetError(f"CSV header is missing feature columns: {missing}")
+    return [names.index(name) for name in FEATURE_NAMES]
+
+
+def count_rows(path: Path, fmt: str | None = None) -> int:
+    fmt = detect_format(path, fmt)
+    if fmt == "npy":
+        return int(np.load(path, mmap_mode="r").shape[0])
+    if fmt == "parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+
+    rows = _count_newlines(path)
+    if fmt == "csv":
+        with open(path, newline="") as f:
+            first = next(csv.reader(f), None)
+        if first is not None and _csv_columns(first) is not None:
+            rows -= 1
+    return rows
+
+
+def iter_chunks(path: Path, chunk_rows: int, fmt: str | None = None) -> Iterator[np.ndarray]:
+    fmt = detect_format(path, fmt)
+    reader = {
+        "csv": _iter_csv,
+        "ndjson": _iter_ndjson,
+        "parquet": _iter_parquet,
+        "npy": _iter_npy,
+    }[fmt]
+    yield from reader(Path(path), chunk_rows)
+
+
+def _iter_csv(path: Path, chunk_rows: int) -> Iterator[np.ndarray]:
+    with open(path, newline="") as f:
+        first = f.readline()
+        if not first:
+            return
+        columns = _csv_columns(next(csv.reader([first]), []))
+        if columns is None:
+            f.seek(0)
+            columns = list(range(len(FEATURE_NAMES)))
+
+        while lines := list(itertools.islice(f, chunk_rows)):
+            # loadtxt handles a clean chunk in one call. It raises on a bad
+            # value and silently skips blank lines, so any chunk that does
+            # not come back with one row per line is parsed row by row, and
+            # rows that fail become NaN to be reported as invalid in place.
+            try:
+                chunk = np.loadtxt(lines, delimiter=",", usecols=columns, dtype=np.float64, ndmin=2, comments=None)
+            except ValueError:
+                chunk = None
+            if chunk is None or len(chunk) != len(lines):
+                chunk = np.asarray([_csv_row(line, columns) for line in lines], dtype=np.float64)
+            yield chunk
+
+
+def _csv_row(line: str, columns: list[int]) -> list[float]:
+    try:
+        values = next(csv.reader([line]))
+        return [float(values[i]) for i in columns]
+    except (StopIteration, IndexError, ValueError, csv.Error):
+        return [np.nan] * len(FEATURE_NAMES)
+
+
+def _iter_ndjson(path: Path, chunk_rows: int) -> Iterator[np.ndarray]:
+    with open(path, "rb") as f:
+        line_number = 1
+        while lines := list(itertools.islice(f, chunk_rows)):
+            entries = parse_lines([line.rstrip(b"\r\n") for line in lines], line_number)
+            # Unparseable and blank lines become NaN rows, so they are
+            # reported as invalid in place instead of failing the dataset or
+            # shifting later results against their input lines.
+            features = {number: row for number, row, _ in entries if row is not None}
+            missing = [np.nan] * len(FEATURE_NAMES)
+            rows = [features.get(line_number + i, missing) for i in range(len(lines))]
+            line_number += len(lines)
+            yield np.asarray(rows, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+
+
+def _iter_parquet(path: Path, chunk_rows: int) -> Iterator[np.ndarray]:
+    parquet = pq.ParquetFile(path)
+    missing = [name for name in FEATURE_NAMES if name not in parquet.schema_arrow.names]
+    if missing:
+        raise DatasetError(f"Parquet file is missing feature columns: {missing}")
+
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=list(FEATURE_NAMES)):
+        yield np.column_stack([
+            batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+            for name in FEATURE_NAMES
+        ])
+
+
+def _iter_npy(path: Path, chunk_rows: int) -> Iterator[np.ndarray]:
+    # Memory-mapped, so only the slice being scored is ever paged in
+    data = np.load(path, mmap_mode="r")
+    if data.ndim != 2 or data.shape[1] != len(FEATURE_NAMES):
+        raise DatasetError(f"Expected an (n, {len(FEATURE_NAMES)}) array, got shape {data.shape}")
+    for start in range(0, data.shape[0], chunk_rows):
+        yield np.asarray(data[start:start + chunk_rows], dtype=np.float64)
+
+
+def valid_rows(X: np.ndarray) -> np.ndarray:
+    # NaN fails both comparisons, so unparseable rows are invalid too
+    return ((X >= FEATURE_MIN) & (X <= FEATURE_MAX)).all(axis=1)
+
+
+class ResultWriter:
+    def __init__(self, path: Path, class_names: list[str], fmt: str | None = None):
+        self.path = Path(path)
+        self.fmt = detect_format(self.path, fmt)
+        if self.fmt not in RESULT_FORMATS:
+            raise DatasetError(f"Unsupported result format '{self.fmt}', expected one of {RESULT_FORMATS}")
+
+        self.class_names = class_names
+        self.columns = ["predicted_class", "class_index", "confidence", *(f"prob_{name}" for name in class_names)]
+        self.rows_written = 0
+        self._file = None
+        self._parquet = None
+
+    def __enter__(self) -> "ResultWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "csv":
+            self._file = open(self.path, "w", newline="")
+            csv.writer(self._file).writerow(self.columns)
+        elif self.fmt == "ndjson":
+            self._file = open(self.path, "wb")
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self._file.close()
+        if self.fmt == "parquet" and self._parquet is None:
+            empty = np.empty(0)
+            self.write(empty.astype(np.int64), empty, np.empty((0, len(self.class_names))), empty.astype(bool))
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def write(self, predictions: np.ndarray, confidences: np.ndarray, probabilities: np.ndarray, valid: np.ndarray):
+        # Invalid rows keep their position with class_index -1 and empty
+        # scores: blank CSV fields, JSON nulls, Parquet nulls
+        names = np.asarray([*self.class_names, ""], dtype=object)
+        predictions = np.where(valid, predictions, -1)
+        labels = names.take(predictions)
+
+        if self.fmt == "parquet":
+            invalid = ~valid
+            table = pa.table({
+                "predicted_class": pa.array(labels.tolist(), type=pa.string()),
+                "class_index": pa.array(predictions),
+                "confidence": pa.array(confidences, mask=invalid),
+                **{
+                    f"prob_{name}": pa.array(probabilities[:, i], mask=invalid)
+                    for i, name in enumerate(self.class_names)
+                },
+            })
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            if not valid.all():
+                confidences = np.where(valid, confidences, None)
+                probabilities = np.where(valid[:, None], probabilities, None)
+            rows = zip(labels, predictions.tolist(), confidences.tolist(), *probabilities.T.tolist())
+            if self.fmt == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                self._file.write(buffer.getvalue())
+            else:
+                self._file.write(b"".join(dumps(dict(zip(self.columns, row))) + b"\n" for row in rows))
+
+        self.rows_written += len(predictions)
+
+
+def score_chunk(model, X: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    valid = valid_rows(X)
+    n_classes = len(model.class_names())
+
+    predictions = np.full(len(X), -1, dtype=np.int64)
+    confidences = np.full(len(X), np.nan)
+    probabilities = np.full((len(X), n_classes), np.nan)
+
+    if valid.all():
+        predictions, confidences, probabilities = model.infer(X)
+    elif valid.any():
+        predictions[valid], confidences[valid], probabilities[valid] = model.infer(X[valid])
+
+    return predictions, confidences, probabilities, valid
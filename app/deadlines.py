@@ -0,0 +1,118 @@
+import asyncio
+import contextvars
+import json
+import time
+
+from app.metrics import registry
+
+HEADER = b"x-request-timeout"
+
+deadline_exceeded = registry.counter(
+    "deadline_exceeded_total", "Requests answered 504 because their deadline passed, by route", ("path",)
+)
+deadline_dropped = registry.counter(
+    "deadline_dropped_total",
+    "Work dropped because its deadline passed: queue (micro-batcher), executor (before inference "
+    "started) or inference (between chunks of a large batch)",
+    ("stage",),
+)
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded ({stage})")
+        self.stage = stage
+
+
+class Deadline:
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.perf_counter() + timeout
+
+    def remaining(self) -> float:
+        return self.expires_at - time.perf_counter()
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.expires_at
+
+    def check(self, stage: str):
+        if self.expired():
+            deadline_dropped.inc(stage)
+            raise DeadlineExceeded(stage)
+
+
+def parse_timeout(value: str) -> float:
+    # Seconds from "250", "250ms" or "0.25s"; a bare number is milliseconds
+    value = value.strip().lower()
+    if value.endswith("ms"):
+        seconds = float(value[:-2]) / 1000
+    elif value.endswith("s"):
+        seconds = float(value[:-1])
+    else:
+        seconds = float(value) / 1000
+    if not seconds > 0:
+        raise ValueError("timeout must be positive")
+    return seconds
+
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+async def wait(awaitable, deadline: Deadline | None):
+    # Stops waiting once the deadline passes. Cancelling the wait also
+    # cancels executor work that has not started yet, and the batcher
+    # skips entries whose caller has gone.
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(deadline.remaining(), 0.0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("wait")
+
+
+class RequestDeadline:
+    # Pure ASGI: turns the X-Request-Timeout header (or the configured
+    # default) into a Deadline measured from when the request arrived, and
+    # makes it available to handlers through a context variable.
+    def __init__(self, app, default_timeout_ms: float = 0.0):
+        self.app = app
+        self.default_timeout = default_timeout_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = self.default_timeout
+        for name, value in scope["headers"]:
+            if name == HEADER:
+                try:
+                    timeout = parse_timeout(value.decode("latin-1"))
+                except ValueError:
+                    await _send_error(send, 400, f"Invalid X-Request-Timeout '{value.decode('latin-1')}'")
+                    return
+                break
+
+        if not timeout:
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_deadline.set(Deadline(timeout))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_deadline.reset(token)
+
+
+async def _send_error(send, status: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app import config
+from app.deadlines import Deadline
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceOverloaded(Exception):
+    pass
+
+
+class InferenceExecutor:
+    def __init__(self, max_workers: int, max_queue: int):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: ThreadPoolExecutor | None = None
+        self._pending = 0
+        self._rejected = 0
+        self._waiting: dict[int, float] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference"
+            )
+        return self._pool
+
+    def _release(self, task_id: int):
+        with self._lock:
+            self._pending -= 1
+            self._waiting.pop(task_id, None)
+
+    async def run(self, fn: Callable[..., Any], *args, deadline: Deadline | None = None) -> Any:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceOverloaded(
+                    f"Inference queue full ({self._pending} tasks pending)"
+                )
+            self._pending += 1
+            task_id = next(self._ids)
+            self._waiting[task_id] = time.perf_counter()
+
+        try:
+            future = self._get_pool().submit(self._started, task_id, deadline, fn, *args)
+        except Exception:
+            self._release(task_id)
+            raise
+
+        # The slot is freed when the work finishes, not when the caller stops
+        # waiting, so cancelled requests still count against the bound.
+        future.add_done_callback(lambda _: self._release(task_id))
+        return await asyncio.wrap_future(future)
+
+    def _started(self, task_id: int, deadline: Deadline | None, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            self._waiting.pop(task_id, None)
+        if deadline is not None:
+            deadline.check("executor")
+        return fn(*args)
+
+    def queue_delay(self) -> float:
+        # How long the oldest task still waiting for a thread has waited.
+        # Admission control sheds load on this; it reads 0 as soon as the
+        # queue drains, so shedding stops without needing new samples.
+        with self._lock:
+            oldest = next(iter(self._waiting.values()), None)
+        return 0.0 if oldest is None else time.perf_counter() - oldest
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            logger.info("Inference executor shut down")
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rejected": self._rejected,
+            "queue_delay_ms": round(self.queue_delay() * 1000, 3),
+        }
+
+
+inference_executor = InferenceExecutor(
+    max_workers=config.INFERENCE_WORKERS,
+    max_queue=config.INFERENCE_QUEUE_SIZE,
+)
@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app import config
+from app.datasets import RESULT_FORMATS, DatasetError, ResultWriter, count_rows, detect_format, iter_chunks, score_chunk
+from app.predict import ModelService, model_service
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, input_path: Path, result_dir: Path, input_format: str, output_format: str):
+        self.id = uuid.uuid4().hex
+        self.input_path = input_path
+        self.output_path = result_dir / f"{self.id}.{output_format}"
+        self.input_format = input_format
+        self.output_format = output_format
+        self.status = "queued"
+        self.error: str | None = None
+        self.rows_total: int | None = None
+        self.rows_done = 0
+        self.rows_invalid = 0
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    def rows_per_sec(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.rows_done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> float | None:
+        if self.status != "running" or not self.rows_total:
+            return None
+        rate = self.rows_per_sec()
+        if rate == 0:
+            return None
+        return max(self.rows_total - self.rows_done, 0) / rate
+
+    def as_dict(self) -> dict:
+        progress = None
+        if self.rows_total:
+            progress = min(self.rows_done / self.rows_total, 1.0)
+        elif self.status == "completed":
+            progress = 1.0
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "input_path": str(self.input_path),
+            "output_path": str(self.output_path),
+            "rows_total": self.rows_total,
+            "rows_done": self.rows_done,
+            "rows_invalid": self.rows_invalid,
+            "progress": progress,
+            "rows_per_sec": self.rows_per_sec(),
+            "eta_seconds": self.eta_seconds(),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    def __init__(
+        self,
+        service: ModelService,
+        data_dir: Path,
+        workers: int,
+        chunk_rows: int,
+        ttl_seconds: float = 86400.0,
+        max_finished: int = 1000,
+    ):
+        self.service = service
+        self.data_dir = Path(data_dir)
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self.purged = 0
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._stopping = threading.Event()
+
+    @property
+    def upload_dir(self) -> Path:
+        return self.data_dir / "uploads"
+
+    @property
+    def result_dir(self) -> Path:
+        return self.data_dir / "results"
+
+    def resolve_input(self, path: str) -> Path:
+        # Only files under the data directory may be scored; the API must
+        # not become a way to read arbitrary files off the pod.
+        root = self.data_dir.resolve()
+        resolved = (root / path).resolve()
+        if not resolved.is_relative_to(root):
+            raise DatasetError(f"Input path must be inside {self.data_dir}")
+        if not resolved.is_file():
+            raise DatasetError(f"Input file not found: {path}")
+        return resolved
+
+    def submit(self, input_path: Path, input_format: str | None = None, output_format: str = "csv") -> Job:
+        input_format = detect_format(input_path, input_format)
+        if output_format not in RESULT_FORMATS:
+            raise DatasetError(f"Unsupported result format '{output_format}', expected one of {RESULT_FORMATS}")
+
+        job = Job(input_path, self.result_dir, input_format, output_format)
+        with self._lock:
+            self._jobs[job.id] = job
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scoring-job")
+        self._pool.submit(self._run, job)
+
+        logger.info(f"Queued job {job.id} for {input_path} ({input_format} -> {output_format})")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    def shutdown(self):
+        self._stopping.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for job in self._jobs.values():
+            if job.status == "queued":
+                job.status = "cancelled"
+
+    def purge(self):
+        # Finished jobs are kept for ttl_seconds and at most max_finished of
+        # them; their results and uploaded inputs go with them. Queued and
+        # running jobs are never touched. Runs on the job pool, not the
+        # event loop, since it walks the result and upload directories.
+        now = time.time()
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.finished_at is not None),
+                key=lambda job: job.finished_at,
+            )
+            excess = len(finished) - self.max_finished
+            expired = [
+                job for i, job in enumerate(finished)
+                if i < excess or (self.ttl_seconds > 0 and now - job.finished_at > self.ttl_seconds)
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+            known = {path.resolve() for job in self._jobs.values() for path in (job.input_path, job.output_path)}
+
+        uploads = self.upload_dir.resolve()
+        for job in expired:
+            job.output_path.unlink(missing_ok=True)
+            if job.input_path.resolve().parent == uploads:
+                job.input_path.unlink(missing_ok=True)
+        self.purged += len(expired)
+
+        # Results and uploads left behind by earlier runs of the server
+        if self.ttl_seconds > 0:
+            for directory in (self.result_dir, self.upload_dir):
+                if not directory.is_dir():
+                    continue
+                for path in directory.iterdir():
+                    try:
+                        if path.resolve() not in known and now - path.stat().st_mtime > self.ttl_seconds:
+                            path.unlink()
+                    except FileNotFoundError:
+                        pass
+
+    def _run(self, job: Job):
+        try:
+            self.purge()
+        except Exception as e:
+            logger.warning(f"Purging old jobs failed: {e}")
+
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.rows_total = count_rows(job.input_path, job.input_format)
+            # The whole job scores on one model version, even if a reload
+            # lands while it runs
+            with self.service.lease() as model, \
+                    ResultWriter(job.output_path, model.class_names(), job.output_format) as writer:
+                for X in iter_chunks(job.input_path, self.chunk_rows, job.input_format):
+                    if self._stopping.is_set():
+                        raise JobCancelled("Server shutting down")
+                    predictions, confidences, probabilities, valid = score_chunk(model, X)
+                    writer.write(predictions, confidences, probabilities, valid)
+                    job.rows_done += len(X)
+                    job.rows_invalid += int((~valid).sum())
+            job.status = "completed"
+            logger.info(f"Job {job.id} completed: {job.rows_done} rows at {job.rows_per_sec():.0f} rows/s")
+        except JobCancelled as e:
+            job.status = "cancelled"
+            job.error = str(e)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+
+
+job_manager = JobManager(
+    model_service,
+    data_dir=Path(config.JOBS_DIR),
+    workers=config.JOB_WORKERS,
+    chunk_rows=config.JOB_CHUNK_ROWS,
+    ttl_seconds=config.JOB_TTL_SECONDS,
+    max_finished=config.JOB_MAX_FINISHED,
+)
@@ -0,0 +1,124 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through extra=
+# and becomes a field of the JSON line.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    # The stock QueueHandler formats the message on the calling thread and
+    # reports a full queue as a handler error. Here the record is queued
+    # as is, so %-formatting happens on the listener thread, and a full
+    # queue drops it rather than blocking the event loop.
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RouteSampler:
+    # Decides, before a log record is even built, whether a per-request
+    # INFO line is kept. Rates come from LOG_SAMPLE_RATES, e.g.
+    # "/predict=0.01,/predict/batch=0.1"; other routes use the default.
+    def __init__(self, rates: dict[str, float], default: float = 1.0, logger: logging.Logger | None = None):
+        self.rates = rates
+        self.default = default
+        self.logger = logger or logging.getLogger("app")
+
+    @staticmethod
+    def parse(spec: str) -> dict[str, float]:
+        rates = {}
+        for item in spec.split(","):
+            if not item.strip():
+                continue
+            route, _, rate = item.partition("=")
+            try:
+                rates[route.strip()] = float(rate)
+            except ValueError:
+                raise ValueError(f"Invalid LOG_SAMPLE_RATES entry '{item}', expected route=rate")
+        return rates
+
+    def sample(self, route: str) -> bool:
+        if not self.logger.isEnabledFor(logging.INFO):
+            return False
+        rate = self.rates.get(route, self.default)
+        return rate >= 1.0 or random.random() < rate
+
+
+_handler: DroppingQueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def configure_logging(level: str = "INFO", fmt: str = "text", queue_size: int = 10000):
+    global _handler, _listener
+
+    numeric_level = logging.getLevelName(level.upper())
+    if not isinstance(numeric_level, int):
+        raise ValueError(f"Unknown LOG_LEVEL '{level}'")
+    if fmt not in ("text", "json"):
+        raise ValueError(f"Unknown LOG_FORMAT '{fmt}', expected 'text' or 'json'")
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    stop_logging()
+    log_queue = queue.Queue(maxsize=queue_size)
+    _handler = DroppingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(numeric_level)
+
+
+def stop_logging():
+    # Flushes whatever is still queued; safe to call more than once
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_stats() -> dict:
+    return {
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+    }
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,143 @@
+import argparse
+import hashlib
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from app.compiled import CompiledForest
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_FORMAT_VERSION = 1
+LOOKUP_PATH = Path("model/iris_lookup.npz")
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class LookupTable:
+    def __init__(self, thresholds: list[np.ndarray], index: np.ndarray, table: np.ndarray, classes: np.ndarray):
+        self.thresholds = thresholds
+        self.index = index
+        self.table = table
+        self.classes_ = classes
+        self.n_features_in_ = len(thresholds)
+        self.shape = tuple(len(edges) + 1 for edges in thresholds)
+
+    @classmethod
+    def compile(cls, forest: CompiledForest, chunk_cells: int = 65536) -> "LookupTable":
+        # Every split compares x <= t, so along each feature the forest is
+        # constant on (t[i-1], t[i]]. Probing each cell at its upper edge
+        # (and +inf for the last one) evaluates the whole domain exactly.
+        thresholds = []
+        for f in range(forest.n_features_in_):
+            internal = forest.children[1::2] != np.arange(len(forest.feature))
+            thresholds.append(np.unique(forest.threshold[internal & (forest.feature == f)]))
+
+        edges = [np.append(t, np.inf) for t in thresholds]
+        shape = tuple(len(e) for e in edges)
+        n_cells = int(np.prod(shape))
+
+        probabilities = np.empty((n_cells, len(forest.classes_)), dtype=np.float64)
+        for start in range(0, n_cells, chunk_cells):
+            cells = np.arange(start, min(start + chunk_cells, n_cells))
+            coords = np.unravel_index(cells, shape)
+            probes = np.column_stack([e[c] for e, c in zip(edges, coords)])
+            probabilities[cells] = forest.leaf_proba(forest.traverse(probes))
+
+        table, index = np.unique(probabilities, axis=0, return_inverse=True)
+        index_dtype = np.uint16 if len(table) <= np.iinfo(np.uint16).max else np.uint32
+
+        return cls(thresholds, index.reshape(shape).astype(index_dtype), table, forest.classes_)
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["LookupTable", dict]:
+        with np.load(path, allow_pickle=False) as data:
+            n_features = int(data["n_features"])
+            lookup = cls(
+                [data[f"thresholds_{f}"] for f in range(n_features)],
+                data["index"],
+                data["table"],
+                data["classes"],
+            )
+            info = {
+                "format_version": int(data["format_version"]),
+                "model_sha256": str(data["model_sha256"]),
+            }
+        return lookup, info
+
+    def save(self, path: Path, model_sha256: str):
+        np.savez_compressed(
+            path,
+            format_version=LOOKUP_FORMAT_VERSION,
+            model_sha256=model_sha256,
+            n_features=self.n_features_in_,
+            index=self.index,
+            table=self.table,
+            classes=self.classes_,
+            **{f"thresholds_{f}": t for f, t in enumerate(self.thresholds)},
+        )
+
+    def cell_indices(self, X: np.ndarray) -> tuple[np.ndarray, ...]:
+        # Same float32 rounding as sklearn, so boundary values land in the
+        # cell the trees would route them to.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        X = X.astype(np.float64)
+        return tuple(
+            np.searchsorted(edges, X[:, f], side="left")
+            for f, edges in enumerate(self.thresholds)
+        )
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.table.take(self.index[self.cell_indices(X)], axis=0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+
+def load_or_compile(model_path: Path, lookup_path: Path = LOOKUP_PATH) -> LookupTable:
+    digest = file_digest(model_path)
+
+    if lookup_path.exists():
+        lookup, info = LookupTable.load(lookup_path)
+        if info["format_version"] == LOOKUP_FORMAT_VERSION and info["model_sha256"] == digest:
+            logger.info(f"Loaded lookup table from {lookup_path} ({lookup.index.size} cells)")
+            return lookup
+        logger.warning(f"Lookup table at {lookup_path} does not match {model_path}, recompiling")
+    else:
+        logger.warning(f"Lookup table not found at {lookup_path}, compiling")
+
+    import joblib
+    lookup = LookupTable.compile(CompiledForest.from_sklearn(joblib.load(model_path)))
+    logger.info(f"Compiled lookup table: {lookup.index.size} cells, {len(lookup.table)} distinct outputs")
+    return lookup
+
+
+def main():
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Compile a trained forest into a cell lookup table")
+    parser.add_argument("--model", type=Path, default=Path("model/iris_model.joblib"))
+    parser.add_argument("--output", type=Path, default=LOOKUP_PATH)
+    args = parser.parse_args()
+
+    forest = CompiledForest.from_sklearn(joblib.load(args.model))
+    lookup = LookupTable.compile(forest)
+    lookup.save(args.output, file_digest(args.model))
+
+    print(f"Cells per feature: {lookup.shape}")
+    print(f"Total cells: {lookup.index.size}, distinct probability vectors: {len(lookup.table)}")
+    print(f"Saved lookup table to {args.output} ({args.output.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from app.startup import FirstRequestTimer, timeline
+timeline.import_modules("numpy", "pydantic", "starlette", "fastapi", "app.predict", "app.binary", "app.jobs")
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
+import math
+import numpy as np
+import secrets
+import uuid
 from contextlib import asynccontextmanager
 
 from app.schemas import (
@@ -8,27 +18,136 @@ from app.schemas import (
     PredictionOutput,
     BatchPredictionInput,
     BatchPredictionOutput,
-    HealthResponse
+    ColumnarPredictionInput,
+    ColumnarPredictionOutput,
+    HealthResponse,
+    JobRequest,
+    JobStatus
 )
-from app.predict import model_service
+from app import config
+from app.predict import ModelUnavailable, model_service
+from app.batcher import batcher
+from app.executor import inference_executor, InferenceOverloaded
+from app.responses import FastJSONResponse, prediction_response, batch_prediction_response
+from app.columnar import ColumnarValidationError, parse_columnar, columnar_result, validate_bounds
+from app import binary
+from app.streaming import NDJSON_MEDIA_TYPE, NDJSONStreamingResponse, StreamScorer
+from app.datasets import DatasetError, detect_format
+from app.jobs import job_manager
+from app.warmup import readiness, warmup
+from app.reload import ReloadInProgress, model_reloader
+from app.registry import ModelNotFound, model_registry
+from app.shadow import shadow_scorer
+from app import metrics
+from app import logs
+from app.logs import RouteSampler, configure_logging
+from app.admission import AdmissionControl, AdmissionRejected, admission_controller, current_ticket
+from app import deadlines
+from app.deadlines import DeadlineExceeded, RequestDeadline, current_deadline
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+configure_logging(config.LOG_LEVEL, config.LOG_FORMAT, config.LOG_QUEUE_SIZE)
 logger = logging.getLogger(__name__)
+log_sampler = RouteSampler(RouteSampler.parse(config.LOG_SAMPLE_RATES), config.LOG_SAMPLE_RATE, logger)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    logger.info("Starting up application...")
+stream_scorer = StreamScorer(model_service, inference_executor, config.STREAM_CHUNK_ROWS)
+
+metrics.registry.gauge(
+    "model_ready", "1 once the model is loaded and warmed up", collect=lambda: float(readiness.is_ready())
+)
+metrics.registry.gauge(
+    "startup_ready_seconds", "Seconds from process start until the app was ready",
+    collect=lambda: timeline.ready_at if timeline.ready_at is not None else math.nan
+)
+metrics.registry.gauge(
+    "inference_pending", "Inference calls running or queued on the executor",
+    collect=lambda: inference_executor.get_stats()["pending"]
+)
+
+async def prepare_model():
+    # Runs after the server is accepting connections, so probes can see
+    # "loading" and "warming" instead of a closed port.
     try:
-        model_service.load_model()
+        with timeline.stage("load model"):
+            await asyncio.to_thread(model_service.load_model)
         logger.info("Model loaded successfully during startup")
     except Exception as e:
-        logger.error(f"Failed to load model: {e}")
-        raise
+        logger.error("Failed to load model: %s", e)
+        readiness.set("failed", str(e))
+        return
+    
+    if config.WARMUP_ENABLED:
+        readiness.set("warming")
+        try:
+            with timeline.stage("warm-up"):
+                await warmup.run()
+        except Exception as e:
+            logger.warning("Warm-up failed, serving cold: %s", e)
+    
+    readiness.set("ready")
+    timeline.mark_ready()
+    await model_reloader.start()
+    await shadow_scorer.start()
+
+def deadline_exceeded(path: str, e: DeadlineExceeded) -> HTTPException:
+    deadlines.deadline_exceeded.inc(path)
+    return HTTPException(status_code=504, detail=str(e))
+
+def model_unavailable(e: ModelUnavailable) -> HTTPException:
+    # The model went away after require_model() let the request in, e.g.
+    # during shutdown
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+def single_response(result: tuple[str, float, dict]):
+    # Every single-row route answers the same way; FAST_RESPONSES skips
+    # building and validating the Pydantic models
+    if config.FAST_RESPONSES:
+        return prediction_response(result)
+    predicted_class, confidence, probabilities = result
+    return PredictionOutput(
+        predicted_class=predicted_class,
+        confidence=confidence,
+        probabilities=probabilities
+    )
+
+def batch_response(results: list[tuple[str, float, dict]]):
+    if config.FAST_RESPONSES:
+        return batch_prediction_response(results)
+    return BatchPredictionOutput(predictions=[
+        PredictionOutput(
+            predicted_class=pred_class,
+            confidence=conf,
+            probabilities=probs
+        )
+        for pred_class, conf, probs in results
+    ])
+
+def require_model():
+    if not model_service.is_loaded():
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model is not ready ({readiness.status})",
+            headers={"Retry-After": "1"}
+        )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting up application...")
+    if not binary.arrow_available():
+        logger.warning("pyarrow is not installed: Arrow and Parquet requests will be rejected")
+    if config.BATCHING_ENABLED:
+        with timeline.stage("start batcher"):
+            await batcher.start()
+    preparing = asyncio.create_task(prepare_model())
     yield
     logger.info("Shutting down application...")
+    preparing.cancel()
+    await model_reloader.stop()
+    await shadow_scorer.stop()
+    await batcher.stop()
+    job_manager.shutdown()
+    inference_executor.shutdown()
+    model_service.close()
+    model_registry.close()
 
 app = FastAPI(
     title="Iris Classification API",
@@ -37,6 +156,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(FirstRequestTimer, timeline=timeline)
+
+if config.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionControl, controller=admission_controller, prefixes=config.ADMISSION_PATHS)
+
+app.add_middleware(RequestDeadline, default_timeout_ms=config.DEFAULT_REQUEST_TIMEOUT_MS)
+
+if config.METRICS_ENABLED:
+    app.add_middleware(metrics.RequestMetrics)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -45,6 +174,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    # Raised by handlers whose row count is only known once the body is
+    # parsed; requests shed on arrival never get this far
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.get("/")
 async def root():
     return {
@@ -54,23 +193,75 @@ async def root():
         "health": "/health"
     }
 
+@app.get("/live")
+async def liveness():
+    if readiness.status == "failed":
+        raise HTTPException(status_code=503, detail=f"Model failed to load: {readiness.error}")
+    return {"status": "alive"}
+
 @app.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(response: Response):
     metadata = model_service.get_metadata()
     
+    # Only "ready" is healthy: readiness probes keep traffic away while the
+    # model loads and warms up.
+    if not readiness.is_ready():
+        response.status_code = 503
+    
     return HealthResponse(
-        status="healthy" if model_service.is_loaded() else "unhealthy",
+        status=readiness.status,
         model_loaded=model_service.is_loaded(),
         model_info={
             "accuracy": metadata.get("accuracy", "unknown"),
             "features": metadata.get("feature_names", []),
             "classes": metadata.get("target_names", []),
-            "n_features": metadata.get("n_features", 0)
+            "n_features": metadata.get("n_features", 0),
+            "backend": model_service.get_backend(),
+            "version": model_service.get_version()
+        },
+        metrics={
+            "batching": {"enabled": batcher.is_running(), **batcher.stats.as_dict()},
+            "executor": inference_executor.get_stats(),
+            "cache": model_service.get_cache_stats(),
+            "warmup": warmup.as_dict(),
+            "reload": model_reloader.get_stats(),
+            "registry": model_registry.get_stats(),
+            "shadow": shadow_scorer.get_stats(),
+            "logging": logs.get_stats(),
+            "admission": admission_controller.get_stats()
         }
     )
 
-@app.post("/predict", response_model=PredictionOutput)
+@app.post("/admin/reload")
+async def reload_model(force: bool = False, x_admin_token: str | None = Header(default=None)):
+    # Loads, validates and warms the model now on disk, then swaps it in.
+    # Serving continues on the current model throughout.
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if not secrets.compare_digest(x_admin_token or "", config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if not model_service.is_loaded():
+        raise HTTPException(status_code=409, detail=f"Initial model load is still {readiness.status}")
+    
+    try:
+        return await model_reloader.reload(force=force)
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Reload failed, previous model still active: {e}")
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(content=metrics.registry.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/debug/startup")
+async def startup_timeline():
+    return {**timeline.as_dict(), "backend": model_service.get_backend()}
+
+@app.post("/predict", response_model=PredictionOutput, dependencies=[Depends(require_model)])
 async def predict(input_data: PredictionInput):
+    timer = metrics.stage_timer()
+    timer.mark("parse")
     try:
         features = [
             input_data.sepal_length,
@@ -79,24 +270,58 @@ async def predict(input_data: PredictionInput):
             input_data.petal_width
         ]
         
-        logger.info(f"Predicting for features: {features}")
+        metrics.request_rows.observe(1, "/predict")
+        timer.mark("features")
         
-        predicted_class, confidence, probabilities = model_service.predict(features)
+        deadline = current_deadline()
+        if batcher.is_running():
+            predicted_class, confidence, probabilities = await deadlines.wait(
+                batcher.predict(features, deadline), deadline
+            )
+        else:
+            predicted_class, confidence, probabilities = await deadlines.wait(
+                inference_executor.run(model_service.predict, features, deadline=deadline), deadline
+            )
+        
+        timer.mark("inference")
+        
+        if log_sampler.sample("/predict"):
+            logger.info(
+                "Prediction: %s (confidence: %.4f) for features %s", predicted_class, confidence, features,
+                extra={"route": "/predict", "predicted_class": predicted_class, "confidence": confidence}
+            )
         
-        logger.info(f"Prediction: {predicted_class} (confidence: {confidence:.4f})")
+        shadow_scorer.submit([features], [(predicted_class, confidence, probabilities)])
         
-        return PredictionOutput(
-            predicted_class=predicted_class,
-            confidence=confidence,
-            probabilities=probabilities
+        response = single_response((predicted_class, confidence, probabilities))
+        timer.mark("response")
+        return response
+    
+    except DeadlineExceeded as e:
+        raise deadline_exceeded("/predict", e)
+    
+    except ModelUnavailable as e:
+        raise model_unavailable(e)
+    
+    except InferenceOverloaded as e:
+        metrics.prediction_errors.inc("/predict", "overloaded")
+        logger.warning("Prediction rejected: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": "1"}
         )
     
     except Exception as e:
-        logger.error(f"Prediction error: {e}")
+        metrics.prediction_errors.inc("/predict", "error")
+        logger.error("Prediction error: %s", e)
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
-@app.post("/predict/batch", response_model=BatchPredictionOutput)
+@app.post("/predict/batch", response_model=BatchPredictionOutput, dependencies=[Depends(require_model)])
 async def predict_batch(input_data: BatchPredictionInput):
+    timer = metrics.stage_timer()
+    timer.mark("parse")
+    current_ticket().admit_rows(len(input_data.instances))
     try:
         features_list = [
             [
@@ -108,21 +333,377 @@ async def predict_batch(input_data: BatchPredictionInput):
             for instance in input_data.instances
         ]
         
-        logger.info(f"Batch prediction for {len(features_list)} instances")
+        metrics.request_rows.observe(len(features_list), "/predict/batch")
+        timer.mark("features")
         
-        results = model_service.predict_batch(features_list)
+        if log_sampler.sample("/predict/batch"):
+            logger.info(
+                "Batch prediction for %d instances", len(features_list),
+                extra={"route": "/predict/batch", "rows": len(features_list)}
+            )
         
-        predictions = [
-            PredictionOutput(
-                predicted_class=pred_class,
-                confidence=conf,
-                probabilities=probs
+        deadline = current_deadline()
+        results = await deadlines.wait(
+            inference_executor.run(model_service.predict_batch, features_list, deadline, deadline=deadline),
+            deadline
+        )
+        timer.mark("inference")
+        shadow_scorer.submit(features_list, results)
+        
+        response = batch_response(results)
+        timer.mark("response")
+        return response
+    
+    except DeadlineExceeded as e:
+        raise deadline_exceeded("/predict/batch", e)
+    
+    except ModelUnavailable as e:
+        raise model_unavailable(e)
+    
+    except InferenceOverloaded as e:
+        metrics.prediction_errors.inc("/predict/batch", "overloaded")
+        logger.warning("Batch prediction rejected: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": "1"}
+        )
+    
+    except Exception as e:
+        metrics.prediction_errors.inc("/predict/batch", "error")
+        logger.error("Batch prediction error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+@app.post(
+    "/predict/columnar",
+    response_model=ColumnarPredictionOutput,
+    dependencies=[Depends(require_model)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ColumnarPredictionInput.model_json_schema()}}
+        }
+    }
+)
+async def predict_columnar(request: Request):
+    # The body is parsed straight into NumPy columns; building a pydantic
+    # model per row is exactly the overhead this endpoint exists to avoid.
+    # Parsing and rendering a large body take long enough to stall every
+    # other request, so both run off the event loop.
+    body = await request.body()
+    try:
+        X = await run_in_threadpool(parse_columnar, body)
+    except ColumnarValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    current_ticket().admit_rows(X.shape[0])
+    
+    try:
+        if log_sampler.sample("/predict/columnar"):
+            logger.info(
+                "Columnar prediction for %d rows", X.shape[0],
+                extra={"route": "/predict/columnar", "rows": X.shape[0]}
+            )
+        
+        # The lease keeps the version that scored the rows, and its class
+        # names, in place until the response is built
+        with model_service.lease() as model:
+            if X.shape[0] == 0:
+                return FastJSONResponse(columnar_result(model.class_names(), [], [], []))
+            
+            deadline = current_deadline()
+            predictions, confidences, probabilities = await deadlines.wait(
+                inference_executor.run(model.infer, X, deadline, deadline=deadline), deadline
+            )
+            
+            return await run_in_threadpool(
+                FastJSONResponse, columnar_result(model.class_names(), predictions, confidences, probabilities)
+            )
+    
+    except DeadlineExceeded as e:
+        raise deadline_exceeded("/predict/columnar", e)
+    
+    except ModelUnavailable as e:
+        raise model_unavailable(e)
+    
+    except InferenceOverloaded as e:
+        logger.warning("Columnar prediction rejected: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": "1"}
+        )
+    
+    except Exception as e:
+        logger.error("Columnar prediction error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Columnar prediction failed: {str(e)}")
+
+@app.post(
+    "/predict/binary",
+    response_class=Response,
+    dependencies=[Depends(require_model)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                binary.MATRIX_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+                binary.ARROW_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def predict_binary(request: Request):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    
+    try:
+        body = await request.body()
+        if content_type == binary.ARROW_MEDIA_TYPE:
+            X = binary.decode_arrow(body)
+        elif content_type == binary.MATRIX_MEDIA_TYPE:
+            X = binary.decode_matrix(body)
+        else:
+            raise binary.UnsupportedMediaType(
+                f"Content-Type must be {binary.MATRIX_MEDIA_TYPE} or {binary.ARROW_MEDIA_TYPE}"
+            )
+        validate_bounds(X)
+    except binary.UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except (binary.BinaryFormatError, ColumnarValidationError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    current_ticket().admit_rows(X.shape[0])
+    
+    try:
+        if log_sampler.sample("/predict/binary"):
+            logger.info(
+                "Binary prediction for %d rows (%s)", X.shape[0], content_type,
+                extra={"route": "/predict/binary", "rows": X.shape[0]}
             )
-            for pred_class, conf, probs in results
-        ]
         
-        return BatchPredictionOutput(predictions=predictions)
+        with model_service.lease() as model:
+            class_names = model.class_names()
+            if X.shape[0] == 0:
+                predictions = np.empty(0, dtype=np.int64)
+                confidences = np.empty(0)
+                probabilities = np.empty((0, len(class_names)))
+            else:
+                deadline = current_deadline()
+                predictions, confidences, probabilities = await deadlines.wait(
+                    inference_executor.run(model.infer, X, deadline, deadline=deadline), deadline
+                )
+        
+        if content_type == binary.ARROW_MEDIA_TYPE:
+            return Response(
+                content=binary.encode_arrow(class_names, predictions, confidences, probabilities),
+                media_type=binary.ARROW_MEDIA_TYPE
+            )
+        
+        return Response(
+            content=binary.encode_matrix(binary.result_matrix(predictions, confidences, probabilities)),
+            media_type=binary.MATRIX_MEDIA_TYPE,
+            headers={"X-Columns": ",".join(binary.result_columns(class_names))}
+        )
+    
+    except DeadlineExceeded as e:
+        raise deadline_exceeded("/predict/binary", e)
+    
+    except ModelUnavailable as e:
+        raise model_unavailable(e)
+    
+    except InferenceOverloaded as e:
+        logger.warning("Binary prediction rejected: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": "1"}
+        )
+    
+    except Exception as e:
+        logger.error("Binary prediction error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Binary prediction failed: {str(e)}")
+
+@app.post(
+    "/predict/stream",
+    response_class=NDJSONStreamingResponse,
+    dependencies=[Depends(require_model)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}}
+        }
+    }
+)
+async def predict_stream(request: Request):
+    # Rows are read, scored and written back chunk by chunk, so memory stays
+    # flat no matter how long the upload is. Problems with individual rows
+    # come back in place as {"line": n, "error": ...} objects.
+    if log_sampler.sample("/predict/stream"):
+        logger.info("Streaming prediction started", extra={"route": "/predict/stream"})
+    return NDJSONStreamingResponse(stream_scorer.score(request.stream(), current_deadline()))
+
+@app.post("/jobs", response_model=JobStatus, status_code=202, dependencies=[Depends(require_model)])
+async def create_job(job_request: JobRequest):
+    # Scoring runs on the job pool, not the request path; poll /jobs/{id}
+    # for progress and fetch /jobs/{id}/result once it has completed.
+    try:
+        input_path = job_manager.resolve_input(job_request.input_path)
+        job = job_manager.submit(input_path, job_request.input_format, job_request.output_format)
+    except DatasetError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return job.as_dict()
+
+@app.post(
+    "/jobs/upload",
+    response_model=JobStatus,
+    status_code=202,
+    dependencies=[Depends(require_model)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}
+        }
+    }
+)
+async def upload_job(request: Request, format: str = "csv", output_format: str = "csv"):
+    # The raw body is streamed to disk, so uploads of any size never sit in memory
+    try:
+        detect_format(f"upload.{format}", format)
+    except DatasetError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    job_manager.upload_dir.mkdir(parents=True, exist_ok=True)
+    upload_path = job_manager.upload_dir / f"{uuid.uuid4().hex}.{format}"
+    
+    # File I/O runs on the thread pool so a slow disk never stalls the event loop
+    size = 0
+    f = await run_in_threadpool(open, upload_path, "wb")
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(f.write, chunk)
+            size += len(chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(upload_path.unlink, True)
+        raise
+    await run_in_threadpool(f.close)
     
+    logger.info("Received %d byte upload for a bulk scoring job (%s)", size, format)
+    
+    try:
+        job = job_manager.submit(upload_path, format, output_format)
+    except DatasetError as e:
+        upload_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return job.as_dict()
+
+@app.get("/jobs", response_model=list[JobStatus])
+async def list_jobs():
+    return [job.as_dict() for job in job_manager.list()]
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.as_dict()
+
+@app.get("/jobs/{job_id}/result", response_class=FileResponse)
+async def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    return FileResponse(job.output_path, filename=job.output_path.name)
+
+@app.get("/shadow")
+async def shadow_stats():
+    return shadow_scorer.get_stats()
+
+@app.get("/models")
+async def list_models():
+    return {"models": model_registry.available(), **model_registry.get_stats()}
+
+@asynccontextmanager
+async def registered_model(name: str, version: str | None):
+    # Leased until the response is built, so an LRU eviction meanwhile
+    # cannot close the model under the request
+    try:
+        model = await model_registry.acquire(name, version)
+    except ModelNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"Batch prediction error: {e}")
+        logger.error("Failed to load model '%s': %s", name, e)
+        raise HTTPException(status_code=500, detail=f"Failed to load model '{name}': {str(e)}")
+    try:
+        yield model
+    finally:
+        model.release()
+
+@app.post("/models/{name}/predict", response_model=PredictionOutput)
+async def predict_named(name: str, input_data: PredictionInput, version: str | None = None):
+    features = [
+        input_data.sepal_length,
+        input_data.sepal_width,
+        input_data.petal_length,
+        input_data.petal_width
+    ]
+    
+    deadline = current_deadline()
+    try:
+        async with registered_model(name, version) as model:
+            results = await deadlines.wait(
+                inference_executor.run(model.predict_cached, [features], deadline, deadline=deadline), deadline
+            )
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise deadline_exceeded("/models/{name}/predict", e)
+    except InferenceOverloaded as e:
+        logger.warning("Prediction for model '%s' rejected: %s", name, e)
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        logger.error("Prediction error for model '%s': %s", name, e)
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    
+    return single_response(results[0])
+
+@app.post("/models/{name}/predict/batch", response_model=BatchPredictionOutput)
+async def predict_named_batch(name: str, input_data: BatchPredictionInput, version: str | None = None):
+    current_ticket().admit_rows(len(input_data.instances))
+    features_list = [
+        [
+            instance.sepal_length,
+            instance.sepal_width,
+            instance.petal_length,
+            instance.petal_width
+        ]
+        for instance in input_data.instances
+    ]
+    
+    deadline = current_deadline()
+    try:
+        async with registered_model(name, version) as model:
+            results = await deadlines.wait(
+                inference_executor.run(model.predict_batch, features_list, deadline, deadline=deadline), deadline
+            )
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise deadline_exceeded("/models/{name}/predict/batch", e)
+    except InferenceOverloaded as e:
+        logger.warning("Batch prediction for model '%s' rejected: %s", name, e)
+        raise HTTPException(
+            status_code=503,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        logger.error("Batch prediction error for model '%s': %s", name, e)
         raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+    
+    return batch_response(results)
@@ -0,0 +1,242 @@
+import bisect
+import contextvars
+import math
+import threading
+import time
+from typing import Callable
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), collect: Callable[[], float] | None = None):
+        super().__init__(name, help, labels)
+        self.collect = collect
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def _samples(self) -> list[str]:
+        # A collect callback reads the value from an existing stats object at
+        # scrape time instead of mirroring every update
+        if self.collect is not None:
+            return [f"{self.name} {_format_value(self.collect())}"]
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in values]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        # Per-bucket counts (not cumulative) keep an observation to one
+        # bisect and two increments; render() accumulates them.
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    # Each mark() closes the stage that started at the previous mark, so a
+    # handler only has to call it at stage boundaries.
+    def __init__(self, histogram: Histogram, scope: dict, started: float):
+        self.histogram = histogram
+        self.scope = scope
+        self.path: str | None = None
+        self.last = started
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        if self.path is None:
+            self.path = getattr(self.scope.get("route"), "path", "unmatched")
+        self.histogram.observe(now - self.last, self.path, stage)
+        self.last = now
+
+
+class _NullTimer:
+    def mark(self, stage: str):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+_current_timer: contextvars.ContextVar = contextvars.ContextVar("stage_timer", default=NULL_TIMER)
+
+
+def stage_timer() -> StageTimer | _NullTimer:
+    return _current_timer.get()
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "path", "status")
+)
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body", ("path",)
+)
+stage_duration = registry.histogram(
+    "predict_stage_duration_seconds",
+    "Time spent in each stage of a prediction request: parse (routing, body and validation), "
+    "features, inference, response and serialize",
+    ("path", "stage"),
+)
+request_rows = registry.histogram(
+    "predict_request_rows", "Rows per prediction request", ("path",), buckets=SIZE_BUCKETS
+)
+inference_batch_rows = registry.histogram(
+    "inference_batch_rows", "Rows per inference call made by the micro-batcher", buckets=SIZE_BUCKETS
+)
+prediction_errors = registry.counter(
+    "prediction_errors_total", "Failed prediction requests by route and reason", ("path", "reason")
+)
+model_load_duration = registry.histogram(
+    "model_load_duration_seconds", "Time to load a model directory, including validation",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class RequestMetrics:
+    # Pure ASGI: counts and times every HTTP request under its route
+    # template, and gives prediction handlers a StageTimer through a
+    # context variable. "serialize" runs from the handler's last mark to
+    # the response start, which is where FastAPI encodes a returned model.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timer = StageTimer(stage_duration, scope, started)
+        token = _current_timer.set(timer)
+        status = 500
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timer.path is not None:
+                    timer.mark("serialize")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _current_timer.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_requests.inc(scope["method"], path, status)
+            http_duration.observe(time.perf_counter() - started, path)
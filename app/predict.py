@@ -1,14 +1,365 @@
-import joblib
 import numpy as np
 from pathlib import Path
 import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
+
+from app import config
+from app.compiled import FOREST_FORMAT_VERSION, FOREST_PATH, CompiledForest
+from app.deadlines import Deadline
+from app.lookup import LOOKUP_PATH, LookupTable, file_digest, load_or_compile
+from app.metrics import model_load_duration
+from app.schemas import FEATURE_MIN, FEATURE_MAX
+from app.workers import WorkerPool
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("sklearn", "compiled", "lookup")
+
+def _copy_result(result: tuple[str, float, dict]) -> tuple[str, float, dict]:
+    # Responses never share a probabilities dict with the cache or with
+    # each other
+    predicted_class, confidence, probabilities = result
+    return predicted_class, confidence, dict(probabilities)
+
+class ModelUnavailable(RuntimeError):
+    pass
+
+class PredictionCache:
+    def __init__(self, max_size: int, quantum: float = 0.0):
+        self.max_size = max_size
+        self.quantum = quantum
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def enabled(self) -> bool:
+        return self.max_size > 0
+    
+    def key(self, features: list[float]) -> tuple:
+        if self.quantum > 0:
+            return tuple(round(value / self.quantum) for value in features)
+        return tuple(float(value) for value in features)
+    
+    def get_many(self, keys: list[tuple]) -> list:
+        results = []
+        with self._lock:
+            for key in keys:
+                result = self._entries.get(key)
+                if result is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    result = _copy_result(result)
+                results.append(result)
+        return results
+    
+    def put_many(self, items: list[tuple]):
+        with self._lock:
+            for key, result in items:
+                self._entries[key] = _copy_result(result)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled(),
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "quantum": self.quantum,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+MODEL_DIR = Path("model")
+MODEL_PATH = MODEL_DIR / "iris_model.joblib"
+METADATA_PATH = MODEL_DIR / "metadata.joblib"
+
+class LoadedModel:
+    # Everything that has to change together when the model changes. The
+    # service swaps one reference to this; a request leases the LoadedModel
+    # it picked up and finishes on it even if a reload lands meanwhile.
+    def __init__(self, model, engine, metadata: dict, version: str):
+        self.model = model
+        self.engine = engine
+        self.metadata = metadata
+        self.version = version
+        self.loaded_at = time.time()
+        self.cache = PredictionCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_QUANTUM)
+        self._in_flight = 0
+        self._retired = False
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    def class_names(self) -> list[str]:
+        return self.metadata.get("target_names", ["class_0", "class_1", "class_2"])
+    
+    def acquire(self, allow_retired: bool = False) -> bool:
+        # A lease keeps the engine open until the matching release(). New
+        # requests only lease the active version; work already holding a
+        # retired one may still take nested leases on it.
+        with self._lock:
+            if self._closed or (self._retired and not allow_retired):
+                return False
+            self._in_flight += 1
+            return True
+    
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            idle = self._retired and self._in_flight == 0
+        if idle:
+            self.close()
+    
+    @contextmanager
+    def lease(self) -> Iterator["LoadedModel"]:
+        if not self.acquire(allow_retired=True):
+            raise RuntimeError(f"Model version {self.version[:12]} has been closed")
+        try:
+            yield self
+        finally:
+            self.release()
+    
+    def infer(
+        self,
+        X: np.ndarray,
+        deadline: Deadline | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        chunk = config.INFERENCE_CHUNK_ROWS
+        if deadline is None or chunk <= 0 or len(X) <= chunk:
+            return self._infer(X)
+        
+        # Large inputs with a deadline run in chunks, so a request whose
+        # client has given up stops at the next chunk boundary.
+        parts = []
+        for start in range(0, len(X), chunk):
+            deadline.check("inference")
+            parts.append(self._infer(X[start:start + chunk]))
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+    
+    def _infer(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Leased on its own as well, so inference that outlives a caller
+        # who stopped waiting still keeps the engine open.
+        with self.lease():
+            probabilities = self.engine.predict_proba(X)
+        
+        indices = probabilities.argmax(axis=1)
+        predictions = self.engine.classes_.take(indices)
+        confidences = probabilities[np.arange(len(indices)), indices]
+        
+        return predictions, confidences, probabilities
+    
+    def score(self, X: np.ndarray, deadline: Deadline | None = None) -> list[tuple[str, float, dict]]:
+        return self.format_results(*self.infer(X, deadline))
+    
+    def predict_batch(
+        self,
+        features_list: list[list[float]],
+        deadline: Deadline | None = None
+    ) -> list[tuple[str, float, dict]]:
+        if len(features_list) == 0:
+            return []
+        return self.score(np.asarray(features_list, dtype=np.float64), deadline)
+    
+    def predict_cached(
+        self,
+        features_list: list[list[float]],
+        deadline: Deadline | None = None
+    ) -> list[tuple[str, float, dict]]:
+        # Single-row requests only (/predict, alone or micro-batched): a key
+        # per row costs more than vectorized inference on a real batch.
+        if not self.cache.enabled() or len(features_list) == 0:
+            return self.predict_batch(features_list, deadline)
+        
+        keys = [self.cache.key(features) for features in features_list]
+        results = self.cache.get_many(keys)
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            first_seen = {}
+            for i in missing:
+                first_seen.setdefault(keys[i], i)
+            
+            computed = self.score(
+                np.asarray([features_list[i] for i in first_seen.values()], dtype=np.float64), deadline
+            )
+            fresh = dict(zip(first_seen, computed))
+            for i in missing:
+                results[i] = _copy_result(fresh[keys[i]])
+            self.cache.put_many(list(fresh.items()))
+        
+        return results
+    
+    def memory_bytes(self) -> int:
+        # Array payload of the engine, plus whatever its worker processes
+        # hold; good enough to budget many models against each other, not
+        # an exact RSS figure.
+        if isinstance(self.engine, WorkerPool):
+            return self.engine.memory_bytes() + sum(
+                array.nbytes for array in self.engine.forest.to_arrays().values()
+            )
+        engine = self.engine
+        if isinstance(engine, CompiledForest):
+            return sum(array.nbytes for array in engine.to_arrays().values())
+        if isinstance(engine, LookupTable):
+            return engine.index.nbytes + engine.table.nbytes + sum(t.nbytes for t in engine.thresholds)
+        if hasattr(engine, "estimators_"):
+            return sum(
+                est.tree_.value.nbytes + est.tree_.node_count * 64
+                for est in engine.estimators_
+            )
+        return 0
+    
+    def format_results(
+        self,
+        predictions: np.ndarray,
+        confidences: np.ndarray,
+        probabilities: np.ndarray
+    ) -> list[tuple[str, float, dict]]:
+        class_names = self.class_names()
+        
+        return [
+            (class_names[prediction], confidence, dict(zip(class_names, row)))
+            for prediction, confidence, row in zip(
+                predictions.tolist(), confidences.tolist(), probabilities.tolist()
+            )
+        ]
+    
+    def retire(self):
+        # Called once this version is no longer active; engine resources
+        # (worker processes) go away when the last lease is released.
+        with self._lock:
+            self._retired = True
+            idle = self._in_flight == 0
+        if idle:
+            self.close()
+    
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if isinstance(self.engine, WorkerPool):
+            self.engine.close()
+
+def uses_forest(backend: str, processes: int) -> bool:
+    return backend == "compiled" or (backend == "sklearn" and processes > 0)
+
+def _load_mapped_forest(forest_path: Path, model_path: Path, version: str) -> CompiledForest | None:
+    if not forest_path.exists():
+        logger.info(f"No forest artifact at {forest_path}, loading {model_path}")
+        return None
+    
+    forest, info = CompiledForest.load(forest_path)
+    if info["format_version"] != FOREST_FORMAT_VERSION or info["model_sha256"] != version:
+        logger.warning(f"Forest artifact at {forest_path} does not match {model_path}, ignoring it")
+        return None
+    
+    logger.info(f"Memory-mapped compiled forest from {forest_path} ({forest.n_trees} trees)")
+    return forest
+
+def _build_engine(model, backend: str, processes: int):
+    if backend == "lookup":
+        if processes > 0:
+            logger.warning("INFERENCE_PROCESSES is ignored by the lookup backend")
+        return model
+    
+    if uses_forest(backend, processes):
+        if isinstance(model, CompiledForest):
+            forest = model
+        else:
+            forest = CompiledForest.from_sklearn(model)
+            logger.info(
+                f"Compiled {forest.n_trees} trees "
+                f"({len(forest.feature)} nodes, max depth {forest.max_depth})"
+            )
+        if processes > 0:
+            # Worker processes share the compiled arrays; an sklearn
+            # estimator cannot be mapped read-only across processes.
+            return WorkerPool(forest, processes, config.WORKER_MAX_ROWS, config.WORKER_TIMEOUT_SECONDS).start()
+        return forest
+    
+    return model
+
+def _validate(candidate: LoadedModel):
+    n_features = candidate.engine.n_features_in_
+    n_classes = len(candidate.engine.classes_)
+    if len(candidate.class_names()) != n_classes:
+        raise ValueError(
+            f"Metadata names {len(candidate.class_names())} classes but the model has {n_classes}"
+        )
+    
+    probe = np.linspace(FEATURE_MIN, FEATURE_MAX, 8 * n_features).reshape(-1, n_features)
+    _, _, probabilities = candidate.infer(probe)
+    if probabilities.shape != (len(probe), n_classes) or not np.allclose(probabilities.sum(axis=1), 1.0):
+        raise ValueError("Model produced malformed probabilities on the validation probe")
+
+def load_model_dir(model_dir: Path, backend: str, processes: int) -> LoadedModel:
+    # Builds a complete, validated model from one artifact directory, as
+    # written by train.py: the joblib model and metadata, plus the optional
+    # forest and lookup artifacts alongside them.
+    started = time.perf_counter()
+    model_dir = Path(model_dir)
+    model_path = model_dir / MODEL_PATH.name
+    metadata_path = model_dir / METADATA_PATH.name
+    
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model file not found at {model_path}")
+    
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MODEL_BACKEND '{backend}', expected one of {BACKENDS}")
+    
+    version = file_digest(model_path)
+    
+    # Only the sklearn backend (or a stale artifact) unpickles the
+    # estimator; the others never import joblib or sklearn at all.
+    model = None
+    if backend == "lookup":
+        model = load_or_compile(model_path, model_dir / LOOKUP_PATH.name)
+    elif uses_forest(backend, processes):
+        model = _load_mapped_forest(model_dir / FOREST_PATH.name, model_path, version)
+    if model is None:
+        import joblib
+        logger.info(f"Loading model from {model_path}")
+        model = joblib.load(model_path)
+    
+    if metadata_path.exists():
+        # Metadata is plain lists and numbers, which joblib writes as an
+        # ordinary pickle, so it loads without importing joblib.
+        with open(metadata_path, "rb") as f:
+            metadata = pickle.load(f)
+        logger.info(f"Loaded metadata: {metadata}")
+    else:
+        logger.warning("Metadata file not found")
+        metadata = {}
+    
+    candidate = LoadedModel(model, _build_engine(model, backend, processes), metadata, version)
+    try:
+        _validate(candidate)
+    except Exception:
+        candidate.close()
+        raise
+    model_load_duration.observe(time.perf_counter() - started)
+    return candidate
+
 class ModelService:
     _instance = None
-    _model = None
-    _metadata = None
+    _active: LoadedModel | None = None
+    _backend = config.MODEL_BACKEND
+    _processes = config.INFERENCE_PROCESSES
     
     def __new__(cls):
         if cls._instance is None:
@@ -16,55 +367,101 @@ class ModelService:
         return cls._instance
     
     def load_model(self):
-        if self._model is not None:
+        if self._active is not None:
             logger.info("Model already loaded")
             return
         
-        model_path = Path("model/iris_model.joblib")
-        metadata_path = Path("model/metadata.joblib")
-        
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found at {model_path}")
-        
-        logger.info(f"Loading model from {model_path}")
-        self._model = joblib.load(model_path)
-        
-        if metadata_path.exists():
-            self._metadata = joblib.load(metadata_path)
-            logger.info(f"Loaded metadata: {self._metadata}")
-        else:
-            logger.warning("Metadata file not found")
-            self._metadata = {}
-        
+        self._active = self.load_candidate()
         logger.info("Model loaded successfully")
     
+    def load_candidate(self) -> LoadedModel:
+        # Builds a complete model from what is on disk now, without touching
+        # the active one; load_model and hot reloads both go through here.
+        return load_model_dir(MODEL_DIR, self._backend, self._processes)
+    
+    def swap(self, candidate: LoadedModel) -> LoadedModel | None:
+        # A single reference assignment: requests already holding the old
+        # version finish on it, new ones see the candidate.
+        previous, self._active = self._active, candidate
+        if previous is not None:
+            previous.retire()
+        logger.info(f"Activated model version {candidate.version[:12]}")
+        return previous
+    
+    def _current(self) -> LoadedModel:
+        active = self._active
+        if active is None:
+            raise ModelUnavailable("Model not loaded. Call load_model() first.")
+        return active
+    
+    @contextmanager
+    def lease(self) -> Iterator[LoadedModel]:
+        # Pins the active version until the caller is done with it, so a
+        # swap() meanwhile cannot close its engine. A version retired between
+        # reading it and leasing it is skipped for the one that replaced it.
+        while True:
+            active = self._current()
+            if active.acquire():
+                break
+            if active is self._active:
+                raise ModelUnavailable(f"Model version {active.version[:12]} has been closed")
+        try:
+            yield active
+        finally:
+            active.release()
+    
+    def score(self, X: np.ndarray, deadline: Deadline | None = None) -> list[tuple[str, float, dict]]:
+        with self.lease() as model:
+            return model.score(X, deadline)
+    
     def predict(self, features: list[float]) -> tuple[str, float, dict]:
-        if self._model is None:
-            raise RuntimeError("Model not loaded. Call load_model() first.")
-        
-        X = np.array(features).reshape(1, -1)
-        
-        prediction = self._model.predict(X)[0]
-        probabilities = self._model.predict_proba(X)[0]
-        
-        class_names = self._metadata.get("target_names", ["class_0", "class_1", "class_2"])
-        predicted_class = class_names[prediction]
-        confidence = float(probabilities[prediction])
-        
-        probs_dict = {
-            class_name: float(prob) 
-            for class_name, prob in zip(class_names, probabilities)
-        }
-        
-        return predicted_class, confidence, probs_dict
+        return self.predict_cached([features])[0]
+    
+    def predict_cached(
+        self,
+        features_list: list[list[float]],
+        deadline: Deadline | None = None
+    ) -> list[tuple[str, float, dict]]:
+        with self.lease() as model:
+            return model.predict_cached(features_list, deadline)
     
-    def predict_batch(self, features_list: list[list[float]]) -> list[tuple[str, float, dict]]:
-        return [self.predict(features) for features in features_list]
+    def predict_batch(
+        self,
+        features_list: list[list[float]],
+        deadline: Deadline | None = None
+    ) -> list[tuple[str, float, dict]]:
+        with self.lease() as model:
+            return model.predict_batch(features_list, deadline)
+    
+    def get_cache_stats(self) -> dict:
+        active = self._active
+        if active is None:
+            return PredictionCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_QUANTUM).get_stats()
+        return active.cache.get_stats()
     
     def get_metadata(self) -> dict:
-        return self._metadata if self._metadata else {}
+        active = self._active
+        return active.metadata if active is not None and active.metadata else {}
+    
+    def get_version(self) -> dict:
+        active = self._active
+        if active is None:
+            return {}
+        return {"sha256": active.version, "loaded_at": active.loaded_at}
+    
+    def get_backend(self) -> str:
+        if self._processes > 0 and self._backend != "lookup":
+            return f"compiled ({self._processes} worker processes)"
+        return self._backend
+    
+    def close(self):
+        # Requests still holding a lease finish first; the engine closes
+        # when the last of them releases it.
+        previous, self._active = self._active, None
+        if previous is not None:
+            previous.retire()
     
     def is_loaded(self) -> bool:
-        return self._model is not None
+        return self._active is not None
 
 model_service = ModelService()
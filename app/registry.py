@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app import config
+from app.predict import MODEL_PATH, LoadedModel, load_model_dir
+
+logger = logging.getLogger(__name__)
+
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class ModelNotFound(LookupError):
+    pass
+
+
+def _version_key(version: str) -> list:
+    # re.split with a group alternates text and digit runs, so the keys of
+    # any two versions compare str to str and int to int
+    return [int(part) if i % 2 else part for i, part in enumerate(re.split(r"(\d+)", version))]
+
+
+class ModelRegistry:
+    # Named models live in root/<name>/ as written by train.py --output-dir,
+    # optionally with versions in root/<name>/<version>/. Models load on first
+    # use and stay resident in LRU order until the memory budget evicts them.
+    def __init__(self, root: Path, memory_budget: int, backend: str, processes: int):
+        self.root = Path(root)
+        self.memory_budget = memory_budget
+        self.backend = backend
+        self.processes = processes
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self._models: OrderedDict[tuple[str, str], LoadedModel] = OrderedDict()
+        self._loading: dict[tuple[str, str], asyncio.Task] = {}
+
+    def resolve(self, name: str, version: str | None = None) -> tuple[str, str, Path]:
+        for part in (name, version):
+            if part is not None and not NAME_PATTERN.match(part):
+                raise ModelNotFound(f"Invalid model name or version '{part}'")
+
+        model_dir = self.root / name
+        if not model_dir.is_dir():
+            raise ModelNotFound(f"Model '{name}' not found")
+
+        if version is None:
+            if (model_dir / MODEL_PATH.name).exists():
+                return name, "", model_dir
+            versions = self._versions(model_dir)
+            if not versions:
+                raise ModelNotFound(f"Model '{name}' has no artifacts")
+            version = versions[-1]
+
+        version_dir = model_dir / version
+        if not (version_dir / MODEL_PATH.name).exists():
+            raise ModelNotFound(f"Model '{name}' has no version '{version}'")
+        return name, version, version_dir
+
+    def _versions(self, model_dir: Path) -> list[str]:
+        # Natural order, so v10 comes after v9 and "latest" is the last one
+        return sorted(
+            (child.name for child in model_dir.iterdir() if child.is_dir() and (child / MODEL_PATH.name).exists()),
+            key=_version_key,
+        )
+
+    async def get(self, name: str, version: str | None = None) -> LoadedModel:
+        name, version, model_dir = self.resolve(name, version)
+        key = (name, version)
+
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            self.hits += 1
+            return model
+
+        # Concurrent requests for a model that is not resident share one
+        # load; shield() keeps a cancelled caller from cancelling it for
+        # everyone else.
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, model_dir))
+            self._loading[key] = task
+        return await asyncio.shield(task)
+
+    async def acquire(self, name: str, version: str | None = None) -> LoadedModel:
+        # get() plus a lease, which the caller must release(). A model
+        # evicted between the two is loaded again rather than used closed.
+        while True:
+            model = await self.get(name, version)
+            if model.acquire():
+                return model
+
+    async def _load(self, key: tuple[str, str], model_dir: Path) -> LoadedModel:
+        try:
+            started = time.perf_counter()
+            model = await asyncio.to_thread(load_model_dir, model_dir, self.backend, self.processes)
+            self.loads += 1
+            self._models[key] = model
+            logger.info(
+                f"Loaded model {self._label(key)} in {time.perf_counter() - started:.2f}s "
+                f"({model.memory_bytes() / 1e6:.1f} MB)"
+            )
+            self._evict(keep=key)
+            return model
+        finally:
+            del self._loading[key]
+
+    def _evict(self, keep: tuple[str, str]):
+        # Evicted models are retired, not closed: callers that acquired one
+        # keep using it and its engine closes when the last lease is released.
+        while self.memory_used() > self.memory_budget and len(self._models) > 1:
+            key = next(iter(self._models))
+            if key == keep:
+                break
+            model = self._models.pop(key)
+            model.retire()
+            self.evictions += 1
+            logger.info(f"Evicted model {self._label(key)} to stay within the memory budget")
+
+    def _label(self, key: tuple[str, str]) -> str:
+        name, version = key
+        return f"{name}@{version}" if version else name
+
+    def memory_used(self) -> int:
+        return sum(model.memory_bytes() for model in self._models.values())
+
+    def available(self) -> list[dict]:
+        if not self.root.is_dir():
+            return []
+
+        models = []
+        for model_dir in sorted(child for child in self.root.iterdir() if child.is_dir()):
+            versions = self._versions(model_dir)
+            if (model_dir / MODEL_PATH.name).exists():
+                versions = ["", *versions]
+            if not versions:
+                continue
+            models.append({
+                "name": model_dir.name,
+                "versions": [v for v in versions if v],
+                "loaded": [self._label((model_dir.name, v)) for v in versions if (model_dir.name, v) in self._models],
+            })
+        return models
+
+    def close(self):
+        for model in self._models.values():
+            model.close()
+        self._models.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "loaded": [self._label(key) for key in self._models],
+            "loading": [self._label(key) for key in self._loading],
+            "memory_used_bytes": self.memory_used(),
+            "memory_budget_bytes": self.memory_budget,
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+        }
+
+
+model_registry = ModelRegistry(
+    Path(config.MODELS_DIR),
+    memory_budget=int(config.MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+    backend=config.MODEL_BACKEND,
+    processes=config.INFERENCE_PROCESSES,
+)
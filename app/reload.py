@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from app import config
+from app.compiled import FOREST_PATH
+from app.executor import InferenceExecutor, inference_executor
+from app.lookup import LOOKUP_PATH, file_digest
+from app.predict import METADATA_PATH, MODEL_PATH, ModelService, model_service
+from app.warmup import Warmup
+
+logger = logging.getLogger(__name__)
+
+WATCHED_PATHS = (MODEL_PATH, METADATA_PATH, FOREST_PATH, LOOKUP_PATH)
+
+
+class ReloadInProgress(Exception):
+    pass
+
+
+class ModelReloader:
+    def __init__(
+        self,
+        service: ModelService,
+        executor: InferenceExecutor,
+        watch_seconds: float = 0.0,
+        paths: tuple[Path, ...] = WATCHED_PATHS,
+    ):
+        self.service = service
+        self.executor = executor
+        self.watch_seconds = watch_seconds
+        self.paths = paths
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.last_reload_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._watcher: asyncio.Task | None = None
+
+    def in_progress(self) -> bool:
+        return self._lock.locked()
+
+    async def start(self):
+        if self.watch_seconds > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+            logger.info(f"Watching {', '.join(str(p) for p in self.paths)} every {self.watch_seconds:g}s")
+
+    async def stop(self):
+        # Taking the lock lets a reload that is already running finish (and
+        # swap or clean up its candidate) instead of being cut off mid-load.
+        async with self._lock:
+            if self._watcher is not None:
+                self._watcher.cancel()
+                try:
+                    await self._watcher
+                except asyncio.CancelledError:
+                    pass
+                self._watcher = None
+
+    async def reload(self, force: bool = False) -> dict:
+        if self._lock.locked():
+            raise ReloadInProgress("A model reload is already running")
+
+        async with self._lock:
+            started = time.perf_counter()
+            current = self.service.get_version().get("sha256")
+            if not force and current is not None and await asyncio.to_thread(file_digest, MODEL_PATH) == current:
+                return {"reloaded": False, "reason": "Model file is unchanged", "version": current}
+
+            try:
+                # Loading, validation and warm-up all happen on the candidate
+                # while the active model keeps serving; the two only coexist
+                # in memory until in-flight requests on the old one finish.
+                candidate = await asyncio.to_thread(self.service.load_candidate)
+                if config.WARMUP_ENABLED:
+                    warmup = Warmup(
+                        candidate,
+                        self.executor,
+                        round_size=config.WARMUP_ROUND_SIZE,
+                        batch_size=config.WARMUP_BATCH_SIZE,
+                        min_rounds=config.WARMUP_MIN_ROUNDS,
+                        tolerance=config.WARMUP_TOLERANCE,
+                        max_seconds=config.WARMUP_MAX_SECONDS,
+                    )
+                    try:
+                        await warmup.run()
+                    except Exception:
+                        candidate.close()
+                        raise
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.error(f"Model reload failed, keeping version {str(current)[:12]}: {e}")
+                raise
+
+            self.service.swap(candidate)
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload_at = time.time()
+            duration = time.perf_counter() - started
+            logger.info(f"Reloaded model in {duration:.2f}s ({str(current)[:12]} -> {candidate.version[:12]})")
+
+            return {
+                "reloaded": True,
+                "previous_version": current,
+                "version": candidate.version,
+                "duration_s": round(duration, 3),
+            }
+
+    def _signature(self) -> tuple:
+        signature = []
+        for path in self.paths:
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    async def _watch(self):
+        seen = self._signature()
+        while True:
+            await asyncio.sleep(self.watch_seconds)
+            signature = self._signature()
+            if signature == seen:
+                continue
+
+            # train.py writes several files in turn; wait until a full poll
+            # interval passes with nothing changing before reloading.
+            while True:
+                await asyncio.sleep(self.watch_seconds)
+                settled = self._signature()
+                if settled == signature:
+                    break
+                signature = settled
+            seen = signature
+
+            logger.info("Model files changed on disk, reloading")
+            try:
+                await self.reload(force=True)
+            except Exception:
+                # Already logged and counted; the active model stays in place
+                pass
+
+    def get_stats(self) -> dict:
+        return {
+            "watching": self._watcher is not None and not self._watcher.done(),
+            "in_progress": self.in_progress(),
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_reload_at": self.last_reload_at,
+        }
+
+
+model_reloader = ModelReloader(model_service, inference_executor, watch_seconds=config.MODEL_WATCH_SECONDS)
@@ -0,0 +1,64 @@
+import json
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default
+    ).encode("utf-8")
+
+
+def loads(body: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Results come straight from ModelService with the types PredictionOutput
+# declares, so they are serialized as plain dicts instead of being
+# re-validated through pydantic.
+def prediction_response(result: tuple[str, float, dict]) -> FastJSONResponse:
+    predicted_class, confidence, probabilities = result
+    return FastJSONResponse({
+        "predicted_class": predicted_class,
+        "confidence": confidence,
+        "probabilities": probabilities
+    })
+
+
+def batch_prediction_response(results: list[tuple[str, float, dict]]) -> FastJSONResponse:
+    return FastJSONResponse({
+        "predictions": [
+            {
+                "predicted_class": predicted_class,
+                "confidence": confidence,
+                "probabilities": probabilities
+            }
+            for predicted_class, confidence, probabilities in results
+        ]
+    })
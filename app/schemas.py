@@ -1,11 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+FEATURE_NAMES = ("sepal_length", "sepal_width", "petal_length", "petal_width")
+FEATURE_MIN = 0.0
+FEATURE_MAX = 10.0
 
 class PredictionInput(BaseModel):
-    sepal_length: float = Field(..., ge=0, le=10, description="Sepal length in cm")
-    sepal_width: float = Field(..., ge=0, le=10, description="Sepal width in cm")
-    petal_length: float = Field(..., ge=0, le=10, description="Petal length in cm")
-    petal_width: float = Field(..., ge=0, le=10, description="Petal width in cm")
+    sepal_length: float = Field(..., ge=FEATURE_MIN, le=FEATURE_MAX, description="Sepal length in cm")
+    sepal_width: float = Field(..., ge=FEATURE_MIN, le=FEATURE_MAX, description="Sepal width in cm")
+    petal_length: float = Field(..., ge=FEATURE_MIN, le=FEATURE_MAX, description="Petal length in cm")
+    petal_width: float = Field(..., ge=FEATURE_MIN, le=FEATURE_MAX, description="Petal width in cm")
     
     class Config:
         json_schema_extra = {
@@ -48,7 +52,60 @@ class BatchPredictionInput(BaseModel):
 class BatchPredictionOutput(BaseModel):
     predictions: List[PredictionOutput]
 
+class ColumnarPredictionInput(BaseModel):
+    sepal_length: List[float] = Field(..., description="Sepal lengths in cm")
+    sepal_width: List[float] = Field(..., description="Sepal widths in cm")
+    petal_length: List[float] = Field(..., description="Petal lengths in cm")
+    petal_width: List[float] = Field(..., description="Petal widths in cm")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "sepal_length": [5.1, 6.7],
+                "sepal_width": [3.5, 3.1],
+                "petal_length": [1.4, 4.7],
+                "petal_width": [0.2, 1.5]
+            }
+        }
+
+class ColumnarPredictionOutput(BaseModel):
+    classes: List[str]
+    predicted_class: List[str]
+    class_index: List[int]
+    confidence: List[float]
+    probabilities: List[List[float]]
+
 class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
     model_info: Dict[str, Any]
+    metrics: Dict[str, Any] = Field(default_factory=dict)
+
+class JobRequest(BaseModel):
+    input_path: str = Field(..., description="Input file, relative to the jobs directory")
+    input_format: Optional[str] = Field(None, description="csv, ndjson, parquet or npy; inferred from the extension if omitted")
+    output_format: str = Field("csv", description="csv, ndjson or parquet")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "input_path": "uploads/iris.csv",
+                "output_format": "csv"
+            }
+        }
+
+class JobStatus(BaseModel):
+    id: str
+    status: str
+    input_path: str
+    output_path: str
+    rows_total: Optional[int]
+    rows_done: int
+    rows_invalid: int
+    progress: Optional[float]
+    rows_per_sec: float
+    eta_seconds: Optional[float]
+    error: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
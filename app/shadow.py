@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app import config
+from app.predict import ModelService, model_service
+from app.registry import ModelRegistry, model_registry
+
+logger = logging.getLogger(__name__)
+
+LATENCY_SAMPLES = 10000
+
+
+class ShadowStats:
+    def __init__(self):
+        self.requests = 0
+        self.rows = 0
+        self.dropped = 0
+        self.failures = 0
+        self.agreements = 0
+        self.total_divergence = 0.0
+        self.max_divergence = 0.0
+        self.confusion: dict[str, int] = {}
+        self.primary_ms_per_row = deque(maxlen=LATENCY_SAMPLES)
+        self.shadow_ms_per_row = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, primary_labels: list[str], shadow_labels: list[str], divergence: np.ndarray):
+        self.rows += len(primary_labels)
+        for primary, shadow in zip(primary_labels, shadow_labels):
+            if primary == shadow:
+                self.agreements += 1
+            else:
+                pair = f"{primary}->{shadow}"
+                self.confusion[pair] = self.confusion.get(pair, 0) + 1
+        self.total_divergence += float(divergence.sum())
+        self.max_divergence = max(self.max_divergence, float(divergence.max(initial=0.0)))
+
+    def as_dict(self) -> dict:
+        def percentiles(samples) -> dict:
+            if not samples:
+                return {"p50": None, "p99": None}
+            p50, p99 = np.percentile(samples, [50, 99])
+            return {"p50": round(float(p50), 4), "p99": round(float(p99), 4)}
+
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "agreement_rate": self.agreements / self.rows if self.rows else None,
+            # Total variation distance between the two probability vectors:
+            # 0 is identical, 1 is disjoint
+            "mean_divergence": self.total_divergence / self.rows if self.rows else None,
+            "max_divergence": self.max_divergence,
+            "disagreements": dict(sorted(self.confusion.items(), key=lambda item: -item[1])),
+            # Both timed the same way: one inference call on the same rows,
+            # on the shadow thread
+            "primary_ms_per_row": percentiles(self.primary_ms_per_row),
+            "shadow_ms_per_row": percentiles(self.shadow_ms_per_row),
+        }
+
+
+class ShadowScorer:
+    # Mirrors a sample of live traffic to a candidate model from the
+    # registry. submit() only enqueues; scoring happens on a dedicated
+    # thread, and a full queue drops samples instead of pushing back. The
+    # queue is bounded in rows, not requests, so large batches cannot pile
+    # up millions of rows on this side path.
+    def __init__(
+        self,
+        service: ModelService,
+        registry: ModelRegistry,
+        model: str,
+        fraction: float = 0.1,
+        batch_size: int = 256,
+        queue_rows: int = 8192,
+        max_busy: float = 0.25,
+    ):
+        name, _, version = model.partition("@")
+        self.service = service
+        self.registry = registry
+        self.model_name = name
+        self.model_version = version or None
+        self.fraction = fraction
+        self.batch_size = batch_size
+        self.queue_rows = queue_rows
+        self.max_busy = max_busy
+        self.stats = ShadowStats()
+        self._queue: asyncio.Queue | None = None
+        self._queued_rows = 0
+        self._worker: asyncio.Task | None = None
+        self._pool: ThreadPoolExecutor | None = None
+
+    def enabled(self) -> bool:
+        return bool(self.model_name) and self.fraction > 0
+
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        if not self.enabled() or self.is_running():
+            return
+
+        self._queue = asyncio.Queue()
+        self._queued_rows = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"Shadow scoring {self.fraction:.0%} of traffic against model '{self.model_name}'")
+
+    async def stop(self):
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+
+    def submit(self, features_list: list[list[float]], results: list[tuple[str, float, dict]]):
+        # On the response path: a coin flip and a put_nowait. A batch larger
+        # than batch_size contributes a random batch_size of its rows.
+        if not self.is_running() or random.random() >= self.fraction:
+            return
+        if len(features_list) > self.batch_size:
+            picked = random.sample(range(len(features_list)), self.batch_size)
+            features_list = [features_list[i] for i in picked]
+            results = [results[i] for i in picked]
+        if self._queued_rows + len(features_list) > self.queue_rows:
+            self.stats.dropped += 1
+            return
+        self._queue.put_nowait((features_list, results))
+        self._queued_rows += len(features_list)
+
+    async def _collect(self) -> list[tuple]:
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        while rows < self.batch_size and not self._queue.empty():
+            item = self._queue.get_nowait()
+            batch.append(item)
+            rows += len(item[0])
+        self._queued_rows -= rows
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            try:
+                candidate = await self.registry.acquire(self.model_name, self.model_version)
+                try:
+                    with self.service.lease() as primary:
+                        primary_time, shadow_time, primary_labels, shadow_labels, divergence = \
+                            await loop.run_in_executor(self._pool, self._compare, primary, candidate, batch)
+                finally:
+                    candidate.release()
+                busy = primary_time + shadow_time
+                # Stats are only touched on the event loop thread
+                self.stats.requests += len(batch)
+                self.stats.record(primary_labels, shadow_labels, divergence)
+                self.stats.primary_ms_per_row.append(primary_time * 1000 / len(primary_labels))
+                self.stats.shadow_ms_per_row.append(shadow_time * 1000 / len(primary_labels))
+            except Exception as e:
+                self.stats.failures += 1
+                logger.warning(f"Shadow scoring against '{self.model_name}' failed: {e}")
+                busy = 0.0
+
+            # Cap the shadow's share of CPU: after working for t seconds,
+            # idle long enough that it stays under max_busy of one core.
+            # Samples that arrive meanwhile are dropped once the queue fills.
+            if 0 < self.max_busy < 1:
+                await asyncio.sleep(busy * (1 - self.max_busy) / self.max_busy)
+
+    def _compare(self, primary_model, candidate, batch: list[tuple]) -> tuple[float, float, list[str], list[str], np.ndarray]:
+        X = np.asarray([row for features_list, _ in batch for row in features_list], dtype=np.float64)
+        primary = [result for _, results in batch for result in results]
+
+        # The primary's answers came from the live request; it is run again
+        # here only to time it on the same rows, thread and batch as the
+        # candidate, so the two costs per row can be compared.
+        started = time.perf_counter()
+        primary_model.infer(X)
+        primary_time = time.perf_counter() - started
+        predictions, _, probabilities = candidate.infer(X)
+        shadow_time = time.perf_counter() - primary_time - started
+
+        class_names = candidate.class_names()
+        shadow_labels = [class_names[i] for i in predictions.tolist()]
+        primary_labels = [label for label, _, _ in primary]
+        primary_probabilities = np.asarray([
+            [probs.get(name, 0.0) for name in class_names] for _, _, probs in primary
+        ])
+        divergence = 0.5 * np.abs(primary_probabilities - probabilities).sum(axis=1)
+
+        return primary_time, shadow_time, primary_labels, shadow_labels, divergence
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled(),
+            "model": self.model_name or None,
+            "version": self.model_version,
+            "fraction": self.fraction,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queued_rows": self._queued_rows,
+            **self.stats.as_dict(),
+        }
+
+
+shadow_scorer = ShadowScorer(
+    model_service,
+    model_registry,
+    config.SHADOW_MODEL,
+    fraction=config.SHADOW_FRACTION,
+    batch_size=config.SHADOW_BATCH_SIZE,
+    queue_rows=config.SHADOW_QUEUE_ROWS,
+    max_busy=config.SHADOW_MAX_BUSY,
+)
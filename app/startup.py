@@ -0,0 +1,118 @@
+import importlib
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Modules whose presence after startup is worth reporting: sklearn should
+# only ever be imported by the sklearn backend or a stale artifact.
+WATCHED_MODULES = ("numpy", "pydantic", "starlette", "fastapi", "joblib", "sklearn", "orjson", "pyarrow")
+
+
+def _process_age() -> float:
+    # Seconds since the kernel started this process, so the timeline also
+    # covers interpreter startup and whatever the server imported before us.
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rpartition(")")[2].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupTimeline:
+    def __init__(self):
+        self._origin = time.perf_counter() - _process_age()
+        self.stages: list[dict] = []
+        self.ready_at: float | None = None
+        self.first_request_at: float | None = None
+        self.first_request_ms: float | None = None
+
+    def now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def record(self, name: str, started: float):
+        finished = self.now()
+        self.stages.append({
+            "stage": name,
+            "start_s": round(started, 4),
+            "duration_ms": round((finished - started) * 1000, 2),
+        })
+
+    def stage(self, name: str) -> "_Stage":
+        return _Stage(self, name)
+
+    def import_modules(self, *names: str):
+        # Imported in dependency order, so each entry is the cost that
+        # module adds on top of the ones before it.
+        for name in names:
+            if name in sys.modules:
+                continue
+            started = self.now()
+            importlib.import_module(name)
+            self.record(f"import {name}", started)
+
+    def mark_ready(self):
+        self.ready_at = self.now()
+        summary = ", ".join(f"{s['stage']} {s['duration_ms']:.0f}ms" for s in self.stages)
+        logger.info(f"Ready {self.ready_at:.3f}s after process start ({summary})")
+
+    def mark_first_request(self, latency: float):
+        self.first_request_at = self.now()
+        self.first_request_ms = round(latency * 1000, 2)
+        logger.info(
+            f"First request served {self.first_request_at:.3f}s after process start "
+            f"in {self.first_request_ms:.1f}ms"
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "ready_s": round(self.ready_at, 4) if self.ready_at is not None else None,
+            "first_request_s": round(self.first_request_at, 4) if self.first_request_at is not None else None,
+            "first_request_ms": self.first_request_ms,
+            "stages": self.stages,
+            "modules_loaded": {name: name in sys.modules for name in WATCHED_MODULES},
+        }
+
+
+class _Stage:
+    def __init__(self, timeline: StartupTimeline, name: str):
+        self.timeline = timeline
+        self.name = name
+
+    def __enter__(self):
+        self.started = self.timeline.now()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timeline.record(self.name, self.started)
+
+
+class FirstRequestTimer:
+    # Pure ASGI so it does not interfere with streaming request bodies; once
+    # the first request has been timed it only costs one attribute check.
+    def __init__(self, app, timeline: StartupTimeline):
+        self.app = app
+        self.timeline = timeline
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.timeline.first_request_ms is not None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def timed_send(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                if self.timeline.first_request_ms is None:
+                    self.timeline.mark_first_request(time.perf_counter() - started)
+
+        await self.app(scope, receive, timed_send)
+
+
+timeline = StartupTimeline()
@@ -0,0 +1,209 @@
+import logging
+import re
+from typing import AsyncIterator
+
+import numpy as np
+from starlette.responses import StreamingResponse
+
+from app import deadlines
+from app.deadlines import Deadline, DeadlineExceeded
+from app.executor import InferenceExecutor, InferenceOverloaded
+from app.predict import ModelService
+from app.responses import dumps, loads
+from app.schemas import FEATURE_NAMES, FEATURE_MIN, FEATURE_MAX
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MAX_LINE_BYTES = 64 * 1024
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    media_type = NDJSON_MEDIA_TYPE
+
+    # StreamingResponse normally listens for a client disconnect by calling
+    # receive() alongside the body iterator. Here the iterator is itself
+    # consuming the request body, so only one of them may read it; a
+    # disconnect still surfaces as ClientDisconnect from request.stream().
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[list[bytes]]:
+    # Yields the complete lines of each body chunk as a list; iterating an
+    # async generator line by line costs more than parsing the line itself.
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        if lines:
+            yield lines
+        if len(pending) > MAX_LINE_BYTES:
+            raise LineTooLong(f"Line exceeds {MAX_LINE_BYTES} bytes")
+    if pending:
+        yield [pending]
+
+
+def _is_row(row) -> bool:
+    # Exactly one number per feature. bool is a subclass of int, and
+    # strings or nested lists would only fail later, when a whole chunk
+    # is turned into an array, so all of them are rejected here.
+    return (
+        isinstance(row, list)
+        and len(row) == len(FEATURE_NAMES)
+        and all(type(value) is float or type(value) is int for value in row)
+    )
+
+
+def parse_row(line: bytes | dict | list) -> list[float]:
+    row = loads(line) if isinstance(line, bytes) else line
+    if isinstance(row, dict):
+        missing = [name for name in FEATURE_NAMES if name not in row]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+        row = [row[name] for name in FEATURE_NAMES]
+    elif not isinstance(row, list) or len(row) != len(FEATURE_NAMES):
+        raise ValueError(f"Row must be an object with {list(FEATURE_NAMES)} or an array of {len(FEATURE_NAMES)} numbers")
+    if not _is_row(row):
+        raise ValueError("Features must be numbers")
+    return row
+
+
+# One "[...]" holding no brackets or strings: such a line can only be one
+# JSON value, so it cannot swallow or split a neighbour when lines are
+# joined into a single array.
+FLAT_ARRAY = re.compile(rb'\s*\[[^\[\]"]*\]\s*')
+
+
+def parse_lines(lines: list[bytes], first_line_number: int) -> list[tuple]:
+    numbered = [(first_line_number + i, line) for i, line in enumerate(lines) if line.strip()]
+
+    # Fast path: decode every flat array line with a single loads() call.
+    # Any other line (objects, malformed input) is decoded on its own, and
+    # so is everything if the joined lines fail to decode.
+    flat = [FLAT_ARRAY.fullmatch(line) is not None for _, line in numbered]
+    rows = []
+    if any(flat):
+        try:
+            rows = loads(b"[" + b",".join(line for (_, line), is_flat in zip(numbered, flat) if is_flat) + b"]")
+        except ValueError:
+            pass
+    if len(rows) != sum(flat):
+        flat = [False] * len(numbered)
+    decoded = iter(rows)
+
+    entries = []
+    for (line_number, line), is_flat in zip(numbered, flat):
+        row = next(decoded) if is_flat else line
+        if _is_row(row):
+            entries.append((line_number, row, None))
+        else:
+            entries.append(_parse_entry(line_number, row))
+    return entries
+
+
+def _parse_entry(line_number: int, line_or_row) -> tuple:
+    try:
+        return (line_number, parse_row(line_or_row), None)
+    except ValueError as e:
+        return (line_number, None, str(e))
+
+
+class StreamScorer:
+    def __init__(self, service: ModelService, executor: InferenceExecutor, chunk_rows: int):
+        self.service = service
+        self.executor = executor
+        self.chunk_rows = chunk_rows
+
+    async def score(self, chunks: AsyncIterator[bytes], deadline: Deadline | None = None) -> AsyncIterator[bytes]:
+        # Each entry is (line number, features or None, error or None); a
+        # chunk keeps input order so errors are reported in place.
+        entries = []
+        line_number = 0
+        rows = 0
+
+        try:
+            batches = iter_lines(chunks)
+            while True:
+                try:
+                    lines = await anext(batches)
+                except StopAsyncIteration:
+                    break
+                except LineTooLong as e:
+                    # Nothing after an unterminated oversized line can be trusted
+                    # to line up with the input, so flush what we have and stop.
+                    if entries:
+                        yield await self._score_chunk(entries, deadline)
+                    yield dumps({"line": line_number + 1, "error": str(e)}) + b"\n"
+                    return
+
+                for entry in parse_lines(lines, line_number + 1):
+                    entries.append(entry)
+                    if len(entries) >= self.chunk_rows:
+                        rows += len(entries)
+                        yield await self._score_chunk(entries, deadline)
+                        entries = []
+                line_number += len(lines)
+
+            if entries:
+                rows += len(entries)
+                yield await self._score_chunk(entries, deadline)
+        except DeadlineExceeded as e:
+            # The response has already started, so the rest of the stream is
+            # cut off with one error line naming the first unanswered line
+            deadlines.deadline_exceeded.inc("/predict/stream")
+            yield dumps({"line": entries[0][0] if entries else line_number + 1, "error": str(e)}) + b"\n"
+            return
+
+        logger.info("Streamed predictions for %d rows", rows)
+
+    async def _score_chunk(self, entries: list[tuple], deadline: Deadline | None = None) -> bytes:
+        # parse_lines only lets through rows of exactly four numbers, so the
+        # chunk always converts to an (n, 4) array
+        valid = [i for i, (_, features, _) in enumerate(entries) if features is not None]
+        outputs = [None] * len(entries)
+
+        if valid:
+            X = np.asarray([entries[i][1] for i in valid], dtype=np.float64)
+            in_bounds = ((X >= FEATURE_MIN) & (X <= FEATURE_MAX)).all(axis=1)
+
+            scored = [i for i, ok in zip(valid, in_bounds) if ok]
+            if scored:
+                try:
+                    results = await deadlines.wait(
+                        self.executor.run(self._predict, X[in_bounds], deadline, deadline=deadline), deadline
+                    )
+                except InferenceOverloaded:
+                    # The stream keeps going; only this chunk's rows are lost
+                    results = None
+                    for i in scored:
+                        outputs[i] = {"line": entries[i][0], "error": "Server overloaded, retry later"}
+                if results is not None:
+                    for i, (predicted_class, confidence, probabilities) in zip(scored, results):
+                        outputs[i] = {
+                            "predicted_class": predicted_class,
+                            "confidence": confidence,
+                            "probabilities": probabilities
+                        }
+
+            for i, ok in zip(valid, in_bounds):
+                if not ok:
+                    outputs[i] = {
+                        "line": entries[i][0],
+                        "error": f"Features must be within [{FEATURE_MIN:g}, {FEATURE_MAX:g}]"
+                    }
+
+        for i, (line_number, features, error) in enumerate(entries):
+            if error is not None:
+                outputs[i] = {"line": line_number, "error": error}
+
+        return b"".join(dumps(output) + b"\n" for output in outputs)
+
+    def _predict(self, X: np.ndarray, deadline: Deadline | None) -> list[tuple[str, float, dict]]:
+        return self.service.score(X, deadline)
@@ -0,0 +1,129 @@
+import logging
+import time
+
+import numpy as np
+
+from app import config
+from app.executor import InferenceExecutor, inference_executor
+from app.predict import LoadedModel, ModelService, model_service
+from app.schemas import FEATURE_NAMES, FEATURE_MIN, FEATURE_MAX
+
+logger = logging.getLogger(__name__)
+
+STATES = ("loading", "warming", "ready", "failed")
+
+
+class Readiness:
+    def __init__(self):
+        self.status = "loading"
+        self.error: str | None = None
+
+    def set(self, status: str, error: str | None = None):
+        if status not in STATES:
+            raise ValueError(f"Unknown readiness state '{status}'")
+        if status != self.status:
+            logger.info(f"Readiness: {self.status} -> {status}")
+        self.status = status
+        self.error = error
+
+    def is_ready(self) -> bool:
+        return self.status == "ready"
+
+
+class Warmup:
+    def __init__(
+        self,
+        service: ModelService | LoadedModel,
+        executor: InferenceExecutor,
+        round_size: int = 200,
+        batch_size: int = 256,
+        min_rounds: int = 3,
+        tolerance: float = 0.2,
+        max_seconds: float = 30.0,
+    ):
+        self.service = service
+        self.executor = executor
+        self.round_size = round_size
+        self.batch_size = batch_size
+        self.min_rounds = min_rounds
+        self.tolerance = tolerance
+        self.max_seconds = max_seconds
+        self.rounds: list[dict] = []
+        self.stable = False
+        self.duration = 0.0
+
+    async def run(self, seed: int = 0):
+        # Synthetic rows cover the whole accepted input range, so every
+        # branch of the trees and every cell of a lookup table gets touched.
+        # They bypass the prediction cache so it starts empty.
+        rng = np.random.default_rng(seed)
+        started = time.perf_counter()
+        deadline = started + self.max_seconds
+        self.rounds = []
+        self.stable = False
+
+        while time.perf_counter() < deadline:
+            rows = rng.uniform(FEATURE_MIN, FEATURE_MAX, size=(self.round_size, len(FEATURE_NAMES)))
+            single = []
+            for row in rows:
+                began = time.perf_counter()
+                await self.executor.run(self._score, row[None, :])
+                single.append(time.perf_counter() - began)
+
+            batch = rng.uniform(FEATURE_MIN, FEATURE_MAX, size=(self.batch_size, len(FEATURE_NAMES)))
+            began = time.perf_counter()
+            await self.executor.run(self._score, batch)
+            batch_ms = (time.perf_counter() - began) * 1000
+
+            p50, p99 = np.percentile(single, [50, 99]) * 1000
+            self.rounds.append({"p50_ms": round(p50, 3), "p99_ms": round(p99, 3), "batch_ms": round(batch_ms, 3)})
+
+            if self._has_stabilized():
+                self.stable = True
+                break
+
+        self.duration = time.perf_counter() - started
+        if self.stable:
+            logger.info(
+                f"Warm-up stabilized after {len(self.rounds)} rounds in {self.duration:.2f}s "
+                f"(p99 {self.rounds[-1]['p99_ms']:.2f}ms, first round {self.rounds[0]['p99_ms']:.2f}ms)"
+            )
+        else:
+            logger.warning(
+                f"Warm-up did not stabilize within {self.max_seconds:g}s "
+                f"({len(self.rounds)} rounds), marking ready anyway"
+            )
+
+    def _has_stabilized(self) -> bool:
+        # Stable once the last two rounds' p99 are both within tolerance of
+        # the round before them.
+        if len(self.rounds) < max(self.min_rounds, 3):
+            return False
+        p99s = [r["p99_ms"] for r in self.rounds[-3:]]
+        return all(abs(b - a) <= self.tolerance * a for a, b in zip(p99s, p99s[1:]))
+
+    def _score(self, X: np.ndarray):
+        return self.service.score(X)
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": config.WARMUP_ENABLED,
+            "rounds": len(self.rounds),
+            "stable": self.stable,
+            "duration_s": round(self.duration, 3),
+            "p99_ms": [r["p99_ms"] for r in self.rounds],
+            "last_round": self.rounds[-1] if self.rounds else None,
+        }
+
+
+readiness = Readiness()
+
+warmup = Warmup(
+    model_service,
+    inference_executor,
+    round_size=config.WARMUP_ROUND_SIZE,
+    batch_size=config.WARMUP_BATCH_SIZE,
+    min_rounds=config.WARMUP_MIN_ROUNDS,
+    tolerance=config.WARMUP_TOLERANCE,
+    max_seconds=config.WARMUP_MAX_SECONDS,
+)
@@ -0,0 +1,326 @@
+import logging
+import multiprocessing as mp
+import os
+import queue
+import time
+from collections import deque
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from app.compiled import CompiledForest
+
+logger = logging.getLogger(__name__)
+
+ALIGNMENT = 64
+# Used where /proc is not available: a spawned worker's own interpreter and
+# NumPy come to roughly this much, far more than a small model's arrays
+PROCESS_OVERHEAD_BYTES = 32 * 1024 * 1024
+
+
+def _pack_arrays(arrays: dict[str, np.ndarray]) -> tuple[SharedMemory, list[tuple]]:
+    layout = []
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout.append((name, array.dtype.str, array.shape, offset))
+        offset += array.nbytes
+
+    shm = SharedMemory(create=True, size=max(offset, 1))
+    for (name, dtype, shape, start), array in zip(layout, arrays.values()):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = array
+
+    return shm, layout
+
+
+def _unpack_arrays(shm: SharedMemory, layout: list[tuple]) -> dict[str, np.ndarray]:
+    arrays = {}
+    for name, dtype, shape, offset in layout:
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[name] = array
+    return arrays
+
+
+def _worker_main(model_name, layout, max_depth, n_features, input_name, output_name, max_rows, conn):
+    # Spawned children share the parent's resource tracker, so attaching here
+    # does not hand ownership of the segments to this process.
+    model_shm = SharedMemory(name=model_name)
+    input_shm = SharedMemory(name=input_name)
+    output_shm = SharedMemory(name=output_name)
+
+    forest = CompiledForest.from_arrays(_unpack_arrays(model_shm, layout), max_depth, n_features)
+    inputs = np.ndarray((max_rows, n_features), dtype=np.float64, buffer=input_shm.buf)
+    outputs = np.ndarray((max_rows, len(forest.classes_)), dtype=np.float64, buffer=output_shm.buf)
+
+    conn.send("ready")
+    try:
+        while True:
+            n_rows = conn.recv()
+            if n_rows is None:
+                break
+            try:
+                outputs[:n_rows] = forest.predict_proba(inputs[:n_rows])
+                conn.send(None)
+            except Exception as e:
+                conn.send(repr(e))
+    finally:
+        del forest, inputs, outputs
+        for shm in (model_shm, input_shm, output_shm):
+            shm.close()
+
+
+def _private_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            _, resident, shared = (int(value) for value in f.read().split()[:3])
+    except (OSError, ValueError):
+        return PROCESS_OVERHEAD_BYTES
+    return (resident - shared) * os.sysconf("SC_PAGE_SIZE")
+
+
+class WorkerDied(RuntimeError):
+    pass
+
+
+class _Worker:
+    def __init__(self, input_shm, output_shm, inputs, outputs):
+        self.process = None
+        self.conn = None
+        self.input_shm = input_shm
+        self.output_shm = output_shm
+        self.inputs = inputs
+        self.outputs = outputs
+
+
+class WorkerPool:
+    def __init__(self, forest: CompiledForest, processes: int, max_rows: int = 4096, timeout: float = 30.0):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+
+        self.forest = forest
+        self.processes = processes
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.restarts = 0
+        self._model_shm: SharedMemory | None = None
+        self._layout: list[tuple] = []
+        self._workers: list[_Worker] = []
+        self._free: queue.Queue = queue.Queue()
+
+    def start(self) -> "WorkerPool":
+        if self._workers:
+            return self
+
+        try:
+            self._spawn()
+        except Exception:
+            self.close()
+            raise
+
+        logger.info(
+            f"Started {self.processes} inference worker processes "
+            f"(shared model {self._model_shm.size} bytes, {self.max_rows} rows per slot)"
+        )
+        return self
+
+    def _spawn(self):
+        self._model_shm, self._layout = _pack_arrays(self.forest.to_arrays())
+        n_classes = len(self.classes_)
+
+        for _ in range(self.processes):
+            input_shm = SharedMemory(create=True, size=self.max_rows * self.n_features_in_ * 8)
+            output_shm = SharedMemory(create=True, size=self.max_rows * n_classes * 8)
+            worker = _Worker(
+                input_shm,
+                output_shm,
+                np.ndarray((self.max_rows, self.n_features_in_), dtype=np.float64, buffer=input_shm.buf),
+                np.ndarray((self.max_rows, n_classes), dtype=np.float64, buffer=output_shm.buf),
+            )
+            self._workers.append(worker)
+            self._launch(worker)
+
+        for worker in self._workers:
+            self._wait_ready(worker)
+            self._free.put(worker)
+
+    def _launch(self, worker: _Worker):
+        # spawn, not fork: the API process already runs threads and an event loop
+        ctx = mp.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=_worker_main,
+            args=(
+                self._model_shm.name, self._layout, self.forest.max_depth, self.n_features_in_,
+                worker.input_shm.name, worker.output_shm.name, self.max_rows, child_conn
+            ),
+            daemon=True,
+        )
+        try:
+            process.start()
+        finally:
+            # Only the child may hold its end of the pipe; otherwise a
+            # worker that dies never shows up as EOF here.
+            child_conn.close()
+        worker.process = process
+        worker.conn = parent_conn
+
+    def _wait_ready(self, worker: _Worker):
+        if self._receive(worker) != "ready":
+            raise WorkerDied("Inference worker failed to start")
+
+    def _receive(self, worker: _Worker):
+        # Waits for one reply. A worker that exits, or does not answer within
+        # the timeout, raises instead of blocking the calling thread forever.
+        deadline = time.monotonic() + self.timeout
+        while not worker.conn.poll(min(1.0, max(deadline - time.monotonic(), 0.0))):
+            if not worker.process.is_alive():
+                break
+            if time.monotonic() >= deadline:
+                raise WorkerDied(f"Inference worker {worker.process.pid} did not answer within {self.timeout:g}s")
+        try:
+            return worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            raise WorkerDied(
+                f"Inference worker {worker.process.pid} exited (code {worker.process.exitcode})"
+            )
+
+    def _restart(self, worker: _Worker):
+        # Same shared memory slots, new process
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=5)
+        worker.conn.close()
+        self._launch(worker)
+        self._wait_ready(worker)
+        self.restarts += 1
+        logger.warning(f"Restarted inference worker (now pid {worker.process.pid})")
+
+    def close(self):
+        started = [worker for worker in self._workers if worker.process is not None]
+        for worker in started:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in started:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+        for worker in self._workers:
+            del worker.inputs, worker.outputs
+            worker.input_shm.close()
+            worker.input_shm.unlink()
+            worker.output_shm.close()
+            worker.output_shm.unlink()
+        self._workers = []
+        self._free = queue.Queue()
+
+        if self._model_shm is not None:
+            self._model_shm.close()
+            self._model_shm.unlink()
+            self._model_shm = None
+            logger.info("Inference worker processes stopped")
+
+    def memory_bytes(self) -> int:
+        # Shared model and slot segments, plus each process's private memory
+        total = self._model_shm.size if self._model_shm is not None else 0
+        for worker in self._workers:
+            total += worker.input_shm.size + worker.output_shm.size
+            if worker.process is not None:
+                total += _private_bytes(worker.process.pid)
+        return total
+
+    def _acquire(self, wanted: int) -> list[_Worker]:
+        workers = [self._free.get()]
+        while len(workers) < wanted:
+            try:
+                workers.append(self._free.get_nowait())
+            except queue.Empty:
+                break
+
+        # A worker that died while idle is replaced before it is used; if
+        # that fails the slot goes back to the pool and is retried next time.
+        try:
+            for worker in workers:
+                if not worker.process.is_alive():
+                    self._restart(worker)
+        except Exception:
+            for worker in workers:
+                self._free.put(worker)
+            raise
+        return workers
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if not self._workers:
+            raise RuntimeError("Worker pool is not running. Call start() first.")
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}"
+            )
+
+        out = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        pending = deque(
+            slice(start, min(start + self.max_rows, X.shape[0]))
+            for start in range(0, X.shape[0], self.max_rows)
+        )
+        if not pending:
+            return out
+
+        workers = self._acquire(len(pending))
+        active = deque()
+        failed = []
+        error = None
+
+        def submit(worker):
+            rows = pending.popleft()
+            n_rows = rows.stop - rows.start
+            worker.inputs[:n_rows] = X[rows]
+            try:
+                worker.conn.send(n_rows)
+            except OSError:
+                failed.append(worker)
+                return f"Inference worker {worker.process.pid} exited"
+            active.append((worker, rows))
+            return None
+
+        try:
+            for worker in workers:
+                if pending and error is None:
+                    error = submit(worker)
+
+            # Every submitted chunk is drained, even after an error, so no
+            # worker goes back to the pool with a reply still in its pipe.
+            while active:
+                worker, rows = active.popleft()
+                try:
+                    result = self._receive(worker)
+                except WorkerDied as e:
+                    failed.append(worker)
+                    error = error or str(e)
+                    continue
+                if result is not None:
+                    error = error or result
+                    continue
+                out[rows] = worker.outputs[:rows.stop - rows.start]
+                if pending and error is None:
+                    error = submit(worker)
+        finally:
+            for worker in failed:
+                try:
+                    self._restart(worker)
+                except Exception as e:
+                    logger.error(f"Could not restart inference worker: {e}")
+            for worker in workers:
+                self._free.put(worker)
+
+        if error is not None:
+            raise RuntimeError(f"Inference worker failed: {error}")
+
+        return out
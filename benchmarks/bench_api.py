@@ -0,0 +1,294 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.schemas import FEATURE_NAMES
+
+PERCENTILES = (50, 95, 99, 99.9)
+SCENARIOS = ("micro", "predict", "batch", "stream")
+
+# Higher is better for throughput, lower for everything else
+THROUGHPUT_KEYS = ("requests_per_s", "rows_per_s", "ops_per_s")
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms", "p99.9_ms")
+
+
+def sample_rows(n: int, seed: int = 0) -> list[list[float]]:
+    # Drawn from the training ranges and rounded like real measurements,
+    # from a pool large enough that the prediction cache does not serve
+    # every request
+    low = np.array([4.3, 2.0, 1.0, 0.1])
+    high = np.array([7.9, 4.4, 6.9, 2.5])
+    return np.random.default_rng(seed).uniform(low, high, (n, len(FEATURE_NAMES))).round(2).tolist()
+
+
+def summarize(latencies: list[float], elapsed: float, rows_per_call: int) -> dict:
+    latencies_ms = np.asarray(latencies) * 1000
+    summary = {
+        "count": len(latencies),
+        "errors": 0,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "rows_per_s": round(len(latencies) * rows_per_call / elapsed, 1),
+        "mean_ms": round(float(latencies_ms.mean()), 4) if len(latencies) else None,
+    }
+    values = np.percentile(latencies_ms, PERCENTILES) if len(latencies) else [None] * len(PERCENTILES)
+    for p, value in zip(PERCENTILES, values):
+        summary[f"p{p:g}_ms"] = round(float(value), 4) if value is not None else None
+    return summary
+
+
+def time_calls(fn, duration: float) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    deadline = started + duration
+    while time.perf_counter() < deadline:
+        began = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - began)
+    result = summarize(latencies, time.perf_counter() - started, 1)
+    result["ops_per_s"] = result.pop("requests_per_s")
+    del result["rows_per_s"]
+    return result
+
+
+def run_micro(args) -> dict:
+    from app.predict import model_service
+    from app.schemas import BatchPredictionInput, PredictionInput
+
+    model_service.load_model()
+    rows = sample_rows(10000)
+    payloads = [dict(zip(FEATURE_NAMES, row)) for row in rows]
+    results = {}
+
+    counter = iter(range(sys.maxsize))
+    results["micro/ModelService.predict"] = time_calls(
+        lambda: model_service.predict(rows[next(counter) % len(rows)]), args.duration
+    )
+    results["micro/PredictionInput.validate"] = time_calls(
+        lambda: PredictionInput.model_validate(payloads[next(counter) % len(payloads)]), args.duration
+    )
+
+    for size in args.batch_sizes:
+        batches = [rows[i:i + size] for i in range(0, len(rows) - size + 1, size)] or [rows[:size]]
+        body = {"instances": payloads[:size]}
+        result = time_calls(lambda: model_service.predict_batch(batches[next(counter) % len(batches)]), args.duration)
+        result["rows_per_s"] = round(result["ops_per_s"] * size, 1)
+        results[f"micro/ModelService.predict_batch[{size}]"] = result
+        result = time_calls(lambda: BatchPredictionInput.model_validate(body), args.duration)
+        result["rows_per_s"] = round(result["ops_per_s"] * size, 1)
+        results[f"micro/BatchPredictionInput.validate[{size}]"] = result
+
+    model_service.close()
+    return results
+
+
+async def drive(client, method: str, path: str, bodies: list, headers: dict, concurrency: int, duration: float, warmup: float):
+    latencies = []
+    errors = 0
+    recording = False
+    deadline = 0.0
+
+    async def worker(offset: int):
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            body = bodies[i % len(bodies)]
+            i += concurrency
+            began = time.perf_counter()
+            response = await client.request(method, path, content=body, headers=headers)
+            await response.aread()
+            if recording:
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - began)
+                else:
+                    errors += 1
+
+    # Closed loop: each worker sends its next request as soon as the last
+    # one completes. The warm-up round is driven the same way and discarded.
+    if warmup > 0:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    recording = True
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def encode(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+async def run_http(args, scenarios: list[str]) -> dict:
+    import httpx
+
+    rows = sample_rows(10000)
+    json_headers = {"Content-Type": "application/json"}
+    plan = []
+    if "predict" in scenarios:
+        bodies = [encode(dict(zip(FEATURE_NAMES, row))) for row in rows]
+        plan.append(("predict", "/predict", bodies, json_headers, 1))
+    if "batch" in scenarios:
+        for size in args.batch_sizes:
+            bodies = [
+                encode({"instances": [dict(zip(FEATURE_NAMES, row)) for row in rows[i:i + size]]})
+                for i in range(0, max(len(rows) - size, 1), size)
+            ][:200]
+            plan.append((f"batch[{size}]", "/predict/batch", bodies, json_headers, size))
+    if "stream" in scenarios:
+        for size in args.stream_rows:
+            lines = "".join(json.dumps(rows[i % len(rows)]) + "\n" for i in range(size)).encode()
+            plan.append((f"stream[{size}]", "/predict/stream", [lines], {"Content-Type": "application/x-ndjson"}, size))
+
+    async def measure(client) -> dict:
+        results = {}
+        for name, path, bodies, headers, rows_per_call in plan:
+            for concurrency in args.concurrency:
+                latencies, errors, elapsed = await drive(
+                    client, "POST", path, bodies, headers, concurrency, args.duration, args.warmup
+                )
+                result = summarize(latencies, elapsed, rows_per_call)
+                result["errors"] = errors
+                result["concurrency"] = concurrency
+                results[f"http/{name}@c{concurrency}"] = result
+                print(
+                    f"  {name:>14} c={concurrency:<4} {result['requests_per_s']:>9.0f} req/s "
+                    f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms",
+                    file=sys.stderr,
+                )
+        return results
+
+    timeout = httpx.Timeout(60.0)
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+            return await measure(client)
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            while (status := (await client.get("/health")).json()["status"]) not in ("ready", "failed"):
+                await asyncio.sleep(0.05)
+            if status == "failed":
+                raise RuntimeError("Model failed to load")
+            return await measure(client)
+
+
+def metadata(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    from app import config
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "target": args.url or "in-process",
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "backend": config.MODEL_BACKEND if args.url is None else None,
+        "duration_s": args.duration,
+        "env": {
+            name: os.environ[name]
+            for name in ("MODEL_BACKEND", "INFERENCE_PROCESSES", "BATCHING_ENABLED", "PREDICTION_CACHE_SIZE", "LOG_LEVEL")
+            if name in os.environ
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    # A metric regresses when it is worse than the baseline by more than
+    # the threshold; benchmarks missing from either side are skipped
+    regressions = []
+    print(f"\n{'benchmark':<48} {'metric':<14} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        throughput = next(key for key in THROUGHPUT_KEYS if key in current)
+        for key in (throughput, *LATENCY_KEYS):
+            if current.get(key) is None or not previous.get(key):
+                continue
+            change = current[key] / previous[key] - 1
+            worse = -change if key in THROUGHPUT_KEYS else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            print(f"{name:<48} {key:<14} {previous[key]:>10.4g} {current[key]:>10.4g} {change:>+7.1%}{flag}")
+            if flag:
+                regressions.append(f"{name} {key}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latency and throughput benchmarks for the API, in-process or against a running server"
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--url", help="Benchmark a running server (e.g. http://localhost:8080) instead of in-process")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--stream-rows", type=int, nargs="+", default=[10000])
+    parser.add_argument("--duration", type=float, default=5.0, help="Measured seconds per benchmark")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds before each HTTP benchmark")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change that counts as a regression")
+    args = parser.parse_args()
+
+    if args.url is None:
+        # Per-request logging would otherwise be part of every number, and
+        # the sampled rows repeat often enough that the prediction cache
+        # would measure itself rather than the model; both can be overridden
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+
+    results = {}
+    if "micro" in args.scenarios:
+        print("micro-benchmarks", file=sys.stderr)
+        results.update(run_micro(args))
+    http = [s for s in args.scenarios if s != "micro"]
+    if http:
+        print(f"HTTP benchmarks ({args.url or 'in-process'})", file=sys.stderr)
+        results.update(asyncio.run(run_http(args, http)))
+
+    print(f"\n{'benchmark':<48} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'p99.9 ms':>9}")
+    for name, result in results.items():
+        ops = result.get("requests_per_s", result.get("ops_per_s"))
+        print(
+            f"{name:<48} {ops:>10.0f} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} "
+            f"{result['p99_ms']:>9.3f} {result['p99.9_ms']:>9.3f}"
+        )
+
+    report = {"meta": metadata(args), "results": results}
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nWrote {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metrics regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Each mode runs in a fresh process because logging is configured from the
+# environment when app.main is imported.
+MODES = {
+    "off": {"LOG_LEVEL": "WARNING"},
+    "sampled": {"LOG_LEVEL": "INFO", "LOG_SAMPLE_RATES": "/predict=0.01,/predict/batch=0.01"},
+    "queued": {"LOG_LEVEL": "INFO", "LOG_SAMPLE_RATES": ""},
+    "sync": {"LOG_LEVEL": "INFO", "LOG_SAMPLE_RATES": ""},
+}
+
+PAYLOAD = {"sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2}
+
+
+async def load(duration: float, concurrency: int, endpoint: str) -> dict:
+    import httpx
+
+    from app.main import app
+
+    body = PAYLOAD if endpoint == "/predict" else {"instances": [PAYLOAD] * 10}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            while (await client.get("/health")).json()["status"] not in ("ready", "failed"):
+                await asyncio.sleep(0.05)
+
+            completed = 0
+            deadline = time.perf_counter() + duration
+
+            async def worker():
+                nonlocal completed
+                while time.perf_counter() < deadline:
+                    response = await client.post(endpoint, json=body)
+                    response.raise_for_status()
+                    completed += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    return {"requests": completed, "requests_per_s": completed / elapsed}
+
+
+def child(mode: str, args):
+    import app.main  # noqa: F401  configures logging from the environment
+    from app.logs import TEXT_FORMAT
+
+    if mode == "sync":
+        # What logging looked like before: a StreamHandler on the root
+        # logger, formatting and writing on the event loop thread
+        logging.basicConfig(level=logging.INFO, format=TEXT_FORMAT, force=True)
+
+    # The benchmark's own client logs every request at INFO; keep it out of
+    # the numbers
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    result = asyncio.run(load(args.duration, args.concurrency, args.endpoint))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request throughput with per-request logging on, sampled and off")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--endpoint", choices=("/predict", "/predict/batch"), default="/predict")
+    parser.add_argument("--modes", nargs="+", choices=tuple(MODES), default=list(MODES))
+    parser.add_argument("--child", choices=tuple(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args)
+        return
+
+    print(f"{'mode':>8} {'requests':>9} {'req/s':>9}")
+    for mode in args.modes:
+        env = {**os.environ, "MODEL_BACKEND": os.environ.get("MODEL_BACKEND", "lookup"), **MODES[mode]}
+        results = []
+        for _ in range(args.repeat):
+            output = subprocess.run(
+                [
+                    sys.executable, __file__, "--child", mode, "--duration", str(args.duration),
+                    "--concurrency", str(args.concurrency), "--endpoint", args.endpoint,
+                ],
+                check=True, capture_output=True, text=True, cwd=ROOT, env=env,
+            ).stdout
+            results.append(json.loads(output))
+        result = max(results, key=lambda r: r["requests_per_s"])
+        print(f"{mode:>8} {result['requests']:>9} {result['requests_per_s']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# End-to-end modes run in a fresh process because the middleware is added
+# when app.main is imported.
+MODES = {
+    "on": {"METRICS_ENABLED": "true"},
+    "off": {"METRICS_ENABLED": "false"},
+}
+
+PAYLOAD = {"sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2}
+ROUTE = SimpleNamespace(path="/predict")
+
+
+async def _handler(scope, receive, send):
+    # Stands in for /predict: the marks and observations a prediction
+    # request makes, then a response, with no other work
+    from app import metrics
+
+    timer = metrics.stage_timer()
+    scope["route"] = ROUTE
+    timer.mark("parse")
+    metrics.request_rows.observe(1, "/predict")
+    timer.mark("features")
+    metrics.inference_batch_rows.observe(1)
+    timer.mark("inference")
+    timer.mark("response")
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def per_request_overhead(iterations: int) -> float:
+    # Microseconds the metrics middleware adds to one request: timer setup,
+    # five stage marks, two size observations, the request counter and the
+    # duration histogram. Measured against the same handler called directly.
+    from app.metrics import RequestMetrics
+
+    instrumented = RequestMetrics(_handler)
+
+    async def run(app) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app({"type": "http", "method": "POST", "path": "/predict"}, _receive, _send)
+        return time.perf_counter() - started
+
+    async def measure() -> tuple[float, float]:
+        await run(instrumented)
+        return await run(_handler), await run(instrumented)
+
+    bare, timed = min(asyncio.run(measure()) for _ in range(3))
+    return (timed - bare) / iterations * 1e6
+
+
+async def load(duration: float, concurrency: int) -> dict:
+    import httpx
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            while (await client.get("/health")).json()["status"] not in ("ready", "failed"):
+                await asyncio.sleep(0.05)
+
+            latencies = []
+            deadline = time.perf_counter() + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    response = await client.post("/predict", json=PAYLOAD)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+    }
+
+
+def child(args):
+    import logging
+
+    import app.main  # noqa: F401  builds the middleware stack from the environment
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    print(json.dumps(asyncio.run(load(args.duration, args.concurrency))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of request metrics: per-request overhead and /predict with metrics on and off")
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    overhead = per_request_overhead(args.iterations)
+    print(f"metrics middleware overhead: {overhead:.1f} us per request")
+
+    results = {}
+    print(f"{'metrics':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>8}")
+    for mode, mode_env in MODES.items():
+        env = {
+            **os.environ, "MODEL_BACKEND": os.environ.get("MODEL_BACKEND", "lookup"),
+            "LOG_LEVEL": "WARNING", **mode_env,
+        }
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run(
+                [
+                    sys.executable, __file__, "--child", "--duration", str(args.duration),
+                    "--concurrency", str(args.concurrency),
+                ],
+                check=True, capture_output=True, text=True, cwd=ROOT, env=env,
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        results[mode] = max(runs, key=lambda r: r["requests_per_s"])
+        result = results[mode]
+        print(f"{mode:>8} {result['requests']:>9} {result['requests_per_s']:>9.0f} {result['p50_ms']:>8.2f}")
+
+    print(f"overhead as a share of p50 with metrics on: {overhead / 1000 / results['on']['p50_ms']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
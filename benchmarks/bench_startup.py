@@ -0,0 +1,88 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def memory_kb() -> dict:
+    fields = {}
+    for source in ("/proc/self/status", "/proc/self/smaps_rollup"):
+        try:
+            with open(source) as f:
+                for line in f:
+                    name, _, value = line.partition(":")
+                    if name in ("VmRSS", "RssAnon", "RssFile", "Pss"):
+                        fields[name] = int(value.split()[0])
+        except OSError:
+            pass
+    return fields
+
+
+def child(mode: str, model: Path, artifact: Path):
+    started = time.perf_counter()
+    import numpy as np
+
+    from app.compiled import CompiledForest
+
+    imported = time.perf_counter()
+    if mode == "joblib":
+        import joblib
+
+        forest = CompiledForest.from_sklearn(joblib.load(model))
+    else:
+        forest, _ = CompiledForest.load(artifact)
+    loaded = time.perf_counter()
+
+    forest.predict_proba(np.array([[5.1, 3.5, 1.4, 0.2]]))
+    ready = time.perf_counter()
+
+    print(json.dumps({
+        "import_s": imported - started,
+        "load_s": loaded - imported,
+        "first_predict_s": ready - loaded,
+        "total_s": ready - started,
+        **memory_kb(),
+    }))
+
+
+def run(mode: str, args) -> list[dict]:
+    results = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--model", str(args.model), "--artifact", str(args.artifact)],
+            check=True, capture_output=True, text=True, cwd=ROOT,
+        ).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time and RSS of the joblib vs memory-mapped model load")
+    parser.add_argument("--model", type=Path, default=Path("model/iris_model.joblib"))
+    parser.add_argument("--artifact", type=Path, default=Path("model/iris_forest.bin"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", choices=("joblib", "mmap"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.model, args.artifact)
+        return
+
+    print(f"{'path':>8} {'load ms':>9} {'total ms':>9} {'RSS MB':>8} {'anon MB':>8} {'file MB':>8}")
+    for mode in ("joblib", "mmap"):
+        results = run(mode, args)
+        best = min(results, key=lambda r: r["total_s"])
+        print(
+            f"{mode:>8} {best['load_s'] * 1000:>9.1f} {best['total_s'] * 1000:>9.1f} "
+            f"{best.get('VmRSS', 0) / 1024:>8.1f} {best.get('RssAnon', 0) / 1024:>8.1f} "
+            f"{best.get('RssFile', 0) / 1024:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
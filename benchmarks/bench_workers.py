@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.compiled import CompiledForest
+from app.workers import WorkerPool
+
+
+def measure(engine, threads: int, batch: np.ndarray, duration: float) -> float:
+    rows = [0] * threads
+    stop = time.perf_counter() + duration
+
+    def run(i):
+        while time.perf_counter() < stop:
+            engine.predict_proba(batch)
+            rows[i] += len(batch)
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput scaling of the inference worker pool")
+    parser.add_argument("--model", default="model/iris_model.joblib")
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    forest = CompiledForest.from_sklearn(joblib.load(args.model))
+    batch = np.random.default_rng(0).uniform(0, 8, (args.batch_size, forest.n_features_in_)).round(1)
+
+    baseline = measure(forest, 1, batch, args.duration)
+    print(f"in-process compiled, 1 thread: {baseline:,.0f} rows/s")
+    print(f"{'processes':>9} {'rows/s':>14} {'speedup':>8} {'efficiency':>10}")
+
+    for processes in range(1, args.max_processes + 1):
+        pool = WorkerPool(forest, processes, max_rows=args.batch_size).start()
+        try:
+            throughput = measure(pool, processes, batch, args.duration)
+        finally:
+            pool.close()
+        speedup = throughput / baseline
+        print(f"{processes:>9} {throughput:>14,.0f} {speedup:>7.2f}x {speedup / processes:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
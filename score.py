@@ -0,0 +1,100 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Score a dataset offline with the same engine the API serves"
+    )
+    parser.add_argument("input", type=Path, help="CSV, NDJSON, Parquet or .npy file")
+    parser.add_argument("output", type=Path, help="Result file (.csv, .ndjson or .parquet)")
+    parser.add_argument("--input-format", help="Override the format inferred from the input extension")
+    parser.add_argument("--output-format", help="Override the format inferred from the output extension")
+    parser.add_argument("--backend", choices=("sklearn", "compiled", "lookup"), help="Defaults to MODEL_BACKEND")
+    parser.add_argument(
+        "--processes", type=int,
+        help="Inference worker processes sharing the compiled model (defaults to INFERENCE_PROCESSES)"
+    )
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Settings are read from the environment at import time, so CLI
+    # overrides have to be in place before the app modules load.
+    if args.backend is not None:
+        os.environ["MODEL_BACKEND"] = args.backend
+    if args.processes is not None:
+        os.environ["INFERENCE_PROCESSES"] = str(args.processes)
+    os.environ["PREDICTION_CACHE_SIZE"] = "0"
+
+    from app.datasets import ResultWriter, count_rows, detect_format, iter_chunks, score_chunk
+    from app.predict import model_service
+
+    input_format = detect_format(args.input, args.input_format)
+    output_format = detect_format(args.output, args.output_format)
+
+    model_service.load_model()
+    try:
+        total = count_rows(args.input, input_format)
+        print(f"Scoring {total} rows from {args.input} with the {model_service.get_backend()} backend")
+
+        rows = 0
+        invalid = 0
+        timings = {"read": 0.0, "score": 0.0, "write": 0.0}
+        start = time.perf_counter()
+
+        chunks = iter_chunks(args.input, args.chunk_rows, input_format)
+
+        def read_next():
+            began = time.perf_counter()
+            chunk = next(chunks, None)
+            return chunk, time.perf_counter() - began
+
+        # The next chunk is parsed on a reader thread while the current one
+        # is scored, so I/O and inference overlap instead of taking turns.
+        with model_service.lease() as model, ThreadPoolExecutor(max_workers=1) as reader, \
+                ResultWriter(args.output, model.class_names(), output_format) as writer:
+            pending = reader.submit(read_next)
+            while True:
+                X, read_time = pending.result()
+                timings["read"] += read_time
+                if X is None:
+                    break
+                pending = reader.submit(read_next)
+
+                began = time.perf_counter()
+                predictions, confidences, probabilities, valid = score_chunk(model, X)
+                timings["score"] += time.perf_counter() - began
+
+                began = time.perf_counter()
+                writer.write(predictions, confidences, probabilities, valid)
+                timings["write"] += time.perf_counter() - began
+
+                rows += len(X)
+                invalid += int((~valid).sum())
+                if sys.stdout.isatty():
+                    elapsed = time.perf_counter() - start
+                    print(f"\r{rows}/{total} rows ({rows / elapsed:,.0f} rows/s)", end="", flush=True)
+
+        elapsed = time.perf_counter() - start
+        if sys.stdout.isatty():
+            print()
+        print(f"Wrote {rows} rows to {args.output} ({invalid} invalid)")
+        print(f"Elapsed: {elapsed:.2f}s, throughput: {rows / elapsed if elapsed else 0:,.0f} rows/s")
+        print(
+            f"Read: {timings['read']:.2f}s (overlapped), "
+            f"score: {timings['score']:.2f}s, write: {timings['write']:.2f}s"
+        )
+    finally:
+        model_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from app.compiled import FOREST_PATH, CompiledForest
+from app.lookup import LOOKUP_PATH, LookupTable, file_digest
+from app.predict import METADATA_PATH, MODEL_PATH, load_model_dir, model_service
+from app.schemas import FEATURE_MIN, FEATURE_MAX
+
+
+@pytest.fixture(scope="session")
+def sklearn_model() -> RandomForestClassifier:
+    # Same data split and hyperparameters as train.py
+    iris = load_iris()
+    X_train, _, y_train, _ = train_test_split(
+        iris.data, iris.target, test_size=0.2, random_state=42, stratify=iris.target
+    )
+    return RandomForestClassifier(n_estimators=100, max_depth=5, random_state=42).fit(X_train, y_train)
+
+
+@pytest.fixture(scope="session")
+def forest(sklearn_model) -> CompiledForest:
+    return CompiledForest.from_sklearn(sklearn_model)
+
+
+@pytest.fixture(scope="session")
+def model_dir(tmp_path_factory, sklearn_model, forest):
+    # A complete artifact directory, as train.py writes it
+    directory = tmp_path_factory.mktemp("model")
+    model_path = directory / MODEL_PATH.name
+    joblib.dump(sklearn_model, model_path)
+    joblib.dump({"target_names": load_iris().target_names.tolist()}, directory / METADATA_PATH.name)
+
+    forest.save(directory / FOREST_PATH.name, file_digest(model_path))
+    LookupTable.compile(forest).save(directory / LOOKUP_PATH.name, file_digest(model_path))
+    return directory
+
+
+@pytest.fixture
+def active_model(model_dir, monkeypatch):
+    # Installed as the service's active model for the duration of a test
+    model = load_model_dir(model_dir, "compiled", processes=0)
+    monkeypatch.setattr(model_service, "_active", model)
+    yield model
+    model.close()
+
+
+def threshold_rows(model: RandomForestClassifier, seed: int = 0) -> np.ndarray:
+    # Rows where one feature sits exactly on a split threshold or one ulp
+    # either side of it, the others random; this is where float32 rounding
+    # and <= versus < decide which branch is taken.
+    rng = np.random.default_rng(seed)
+    rows = []
+    for f in range(model.n_features_in_):
+        thresholds = np.unique(np.concatenate([
+            est.tree_.threshold[est.tree_.feature == f] for est in model.estimators_
+        ]))
+        values = np.concatenate([
+            thresholds,
+            np.nextafter(thresholds, -np.inf),
+            np.nextafter(thresholds, np.inf),
+            thresholds.astype(np.float32).astype(np.float64),
+        ])
+        block = rng.uniform(FEATURE_MIN, FEATURE_MAX, (len(values), model.n_features_in_))
+        block[:, f] = values
+        rows.append(block)
+    return np.concatenate(rows)
+
+
+def probe_rows(model: RandomForestClassifier, seed: int = 0) -> np.ndarray:
+    # Threshold rows plus random rows over the accepted domain, half of
+    # them at the 0.1 resolution real measurements arrive with
+    rng = np.random.default_rng(seed)
+    uniform = rng.uniform(FEATURE_MIN, FEATURE_MAX, (5000, model.n_features_in_))
+    return np.concatenate([threshold_rows(model, seed), uniform, uniform.round(1)])
+
+
+@pytest.fixture(scope="session")
+def probes(sklearn_model) -> np.ndarray:
+    return probe_rows(sklearn_model)
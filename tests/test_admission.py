@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected
+from app.executor import InferenceExecutor
+
+
+def test_sheds_while_queue_delay_is_over_budget():
+    delay = [0.0]
+    controller = AdmissionController(max_requests=0, max_rows=0, max_queue_delay_ms=100, delay_sources=(lambda: delay[0],))
+    in_flight = controller.admit("/predict/stream")
+
+    delay[0] = 0.2
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit("/predict")
+    assert (rejected.value.status_code, rejected.value.reason) == (503, "queue_delay")
+
+    # Recovers as soon as the delay falls, with the first request still in flight
+    delay[0] = 0.0
+    controller.admit("/predict").release()
+    in_flight.release()
+    assert controller.shed == {"queue_delay": 1}
+
+
+def test_executor_queue_delay_recovers_once_drained():
+    async def scenario():
+        executor = InferenceExecutor(max_workers=1, max_queue=4)
+        controller = AdmissionController(
+            max_requests=0, max_rows=0, max_queue_delay_ms=50, delay_sources=(executor.queue_delay,)
+        )
+        in_flight = controller.admit("/predict/stream")
+        release = threading.Event()
+        try:
+            blocked = asyncio.ensure_future(executor.run(release.wait))
+            queued = asyncio.ensure_future(executor.run(time.sleep, 0))
+            await asyncio.sleep(0.1)
+
+            assert executor.queue_delay() >= 0.05
+            with pytest.raises(AdmissionRejected):
+                controller.admit("/predict")
+
+            release.set()
+            await asyncio.gather(blocked, queued)
+
+            # Nothing new has run since the burst, and a request is still in
+            # flight, yet the next request is admitted
+            assert executor.queue_delay() == 0.0
+            controller.admit("/predict").release()
+        finally:
+            release.set()
+            in_flight.release()
+            executor.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,105 @@
+import asyncio
+import shutil
+
+import pytest
+from starlette.testclient import TestClient
+
+from app import config, main
+from app.columnar import ColumnarValidationError, parse_columnar
+from app.main import app
+from app.registry import ModelRegistry
+from app.responses import dumps
+
+
+@pytest.fixture
+def client():
+    # No lifespan: these requests are answered before any model is needed
+    return TestClient(app)
+
+
+def test_reload_is_disabled_without_admin_token(client, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "")
+
+    response = client.post("/admin/reload")
+
+    assert response.status_code == 403
+    assert "ADMIN_TOKEN" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}])
+def test_reload_rejects_a_wrong_token(client, monkeypatch, headers):
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+
+    assert client.post("/admin/reload", headers=headers).status_code == 403
+
+
+def test_reload_accepts_the_token(client, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+
+    # Past the token check; the initial model load has not happened here
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "secret"}).status_code == 409
+
+
+def off_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False
+
+
+def test_columnar_parses_and_renders_off_the_event_loop(client, active_model, monkeypatch):
+    threads = []
+
+    def parse(body):
+        threads.append(("parse", off_event_loop()))
+        return parse_columnar(body)
+
+    class Response(main.FastJSONResponse):
+        def render(self, content):
+            threads.append(("render", off_event_loop()))
+            return super().render(content)
+
+    monkeypatch.setattr(main, "parse_columnar", parse)
+    monkeypatch.setattr(main, "FastJSONResponse", Response)
+    columns = {"sepal_length": [5.1, 6.7], "sepal_width": [3.5, 3], "petal_length": [1.4, 5.2], "petal_width": [0.2, 2.3]}
+
+    response = client.post("/predict/columnar", json=columns)
+
+    assert response.status_code == 200
+    assert response.json()["predicted_class"] == ["setosa", "virginica"]
+    assert threads == [("parse", True), ("render", True)]
+
+
+@pytest.mark.parametrize("value", [True, "5.1", None, [5.1]])
+def test_columnar_rejects_non_numbers(value):
+    columns = {"sepal_length": [5.1, value], "sepal_width": [3.5, 3.0], "petal_length": [1.4, 1.4], "petal_width": [0.2, 0.2]}
+
+    with pytest.raises(ColumnarValidationError, match="sepal_length"):
+        parse_columnar(dumps(columns))
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_named_models_answer_like_predict(client, active_model, model_dir, tmp_path, monkeypatch, fast):
+    shutil.copytree(model_dir, tmp_path / "iris")
+    registry = ModelRegistry(tmp_path, memory_budget=1 << 30, backend="compiled", processes=0)
+    monkeypatch.setattr(main, "model_registry", registry)
+    monkeypatch.setattr(config, "FAST_RESPONSES", fast)
+    built = []
+    for name in ("prediction_response", "batch_prediction_response"):
+        monkeypatch.setattr(main, name, lambda *args, build=getattr(main, name): built.append(build) or build(*args))
+    row = {"sepal_length": 6.7, "sepal_width": 3.0, "petal_length": 5.2, "petal_width": 2.3}
+
+    try:
+        named = [
+            client.post("/models/iris/predict", json=row),
+            client.post("/models/iris/predict/batch", json={"instances": [row, row]}),
+        ]
+    finally:
+        registry.close()
+    live = [client.post("/predict", json=row), client.post("/predict/batch", json={"instances": [row, row]})]
+
+    assert [response.json() for response in named] == [response.json() for response in live]
+    # Named and live routes took the same path: the fast builders for
+    # both, or the Pydantic models for both
+    assert len(built) == (4 if fast else 0)
@@ -0,0 +1,61 @@
+import logging
+
+import numpy as np
+import pytest
+
+from app.compiled import ALIGNMENT, FOREST_FORMAT_VERSION, FOREST_PATH, CompiledForest
+from app.lookup import file_digest
+from app.predict import MODEL_PATH, _load_mapped_forest
+
+
+def test_mapped_forest_matches_compiled(forest, tmp_path, probes):
+    path = tmp_path / "forest.bin"
+    forest.save(path, "abc123")
+
+    mapped, info = CompiledForest.load(path)
+
+    assert info == {"format_version": FOREST_FORMAT_VERSION, "model_sha256": "abc123"}
+    assert (mapped.max_depth, mapped.n_features_in_) == (forest.max_depth, forest.n_features_in_)
+    for name, array in forest.to_arrays().items():
+        restored = mapped.to_arrays()[name]
+        np.testing.assert_array_equal(restored, array)
+        assert restored.dtype == array.dtype
+    np.testing.assert_array_equal(mapped.predict_proba(probes), forest.predict_proba(probes))
+
+
+def test_mapped_arrays_are_aligned_read_only_views(forest, tmp_path):
+    path = tmp_path / "forest.bin"
+    forest.save(path, "abc123")
+
+    mapped, _ = CompiledForest.load(path)
+
+    for array in mapped.to_arrays().values():
+        assert isinstance(array.base, np.memmap)
+        assert not array.flags.writeable
+        assert array.ctypes.data % ALIGNMENT == 0
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "forest.bin"
+    path.write_bytes(b"\0" * 256)
+
+    with pytest.raises(ValueError):
+        CompiledForest.load(path)
+
+
+def test_artifact_for_current_model_is_used(model_dir):
+    model_path = model_dir / MODEL_PATH.name
+
+    forest = _load_mapped_forest(model_dir / FOREST_PATH.name, model_path, file_digest(model_path))
+
+    assert isinstance(forest, CompiledForest)
+
+
+def test_stale_artifact_is_ignored(forest, model_dir, tmp_path, caplog):
+    stale = tmp_path / "forest.bin"
+    forest.save(stale, "0" * 64)
+    model_path = model_dir / MODEL_PATH.name
+
+    with caplog.at_level(logging.WARNING, logger="app.predict"):
+        assert _load_mapped_forest(stale, model_path, file_digest(model_path)) is None
+    assert "does not match" in caplog.text
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.batcher import MicroBatcher
+from app.executor import InferenceExecutor
+from app.predict import model_service
+
+
+def run_batched(batcher: MicroBatcher, rows: list[list[float]]) -> list:
+    async def scenario():
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.predict(row) for row in rows), return_exceptions=True)
+        finally:
+            await batcher.stop()
+            batcher.executor.shutdown()
+
+    return asyncio.run(scenario())
+
+
+def test_each_caller_gets_its_own_row(active_model, probes):
+    rows = probes[::97][:40].tolist()
+    batcher = MicroBatcher(model_service, InferenceExecutor(max_workers=1, max_queue=8), max_batch_size=16, max_wait_ms=50)
+
+    results = run_batched(batcher, rows)
+
+    assert results == active_model.predict_batch(rows)
+    # Coalesced, and never past the size limit
+    assert batcher.stats.rows == len(rows)
+    assert batcher.stats.batches < len(rows)
+    assert batcher.stats.max_batch_size <= 16
+
+
+def test_failed_batch_fails_every_caller(monkeypatch):
+    def broken(features_list, deadline=None):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr(model_service, "predict_cached", broken)
+    batcher = MicroBatcher(model_service, InferenceExecutor(max_workers=1, max_queue=8), max_wait_ms=50)
+
+    results = run_batched(batcher, [[5.1, 3.5, 1.4, 0.2]] * 3)
+
+    assert [str(result) for result in results] == ["model exploded"] * 3
+
+
+def test_predict_requires_start():
+    batcher = MicroBatcher(model_service, InferenceExecutor(max_workers=1, max_queue=0))
+    with pytest.raises(RuntimeError, match="not running"):
+        asyncio.run(batcher.predict([5.1, 3.5, 1.4, 0.2]))
@@ -0,0 +1,59 @@
+import numpy as np
+import pyarrow as pa
+from starlette.testclient import TestClient
+
+from app import binary
+from app.main import app
+from app.schemas import FEATURE_NAMES
+
+
+def arrow_stream(columns: dict) -> bytes:
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_arrow_round_trip():
+    X = np.array([[5.1, 3.5, 1.4, 0.2], [6.7, 3.0, 5.2, 2.3]])
+    body = arrow_stream({name: X[:, i] for i, name in enumerate(FEATURE_NAMES)})
+
+    np.testing.assert_array_equal(binary.decode_arrow(body), X)
+
+    body = binary.encode_arrow(
+        ["setosa", "versicolor", "virginica"], np.array([0, 2]), np.array([1.0, 0.9]),
+        np.array([[1.0, 0.0, 0.0], [0.0, 0.1, 0.9]])
+    )
+    result = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    assert result.column("predicted_class").to_pylist() == ["setosa", "virginica"]
+    assert result.column("prob_virginica").to_pylist() == [0.0, 0.9]
+
+
+def test_arrow_endpoint_scores_every_row(active_model, probes):
+    X = probes[::50]
+    body = arrow_stream({name: X[:, i] for i, name in enumerate(FEATURE_NAMES)})
+
+    response = TestClient(app).post("/predict/binary", content=body, headers={"Content-Type": binary.ARROW_MEDIA_TYPE})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == binary.ARROW_MEDIA_TYPE
+    result = pa.ipc.open_stream(pa.py_buffer(response.content)).read_all()
+    predictions, confidences, probabilities = active_model.infer(X)
+    class_names = active_model.class_names()
+    assert result.column_names == [
+        "predicted_class", "class_index", "confidence", *(f"prob_{name}" for name in class_names)
+    ]
+    assert result.column("predicted_class").to_pylist() == [class_names[i] for i in predictions]
+    np.testing.assert_array_equal(result.column("confidence").to_numpy(), confidences)
+    for i, name in enumerate(class_names):
+        np.testing.assert_array_equal(result.column(f"prob_{name}").to_numpy(), probabilities[:, i])
+
+
+def test_arrow_endpoint_rejects_missing_columns(active_model):
+    body = arrow_stream({name: [1.0] for name in FEATURE_NAMES[:3]})
+
+    response = TestClient(app).post("/predict/binary", content=body, headers={"Content-Type": binary.ARROW_MEDIA_TYPE})
+
+    assert response.status_code == 422
+    assert FEATURE_NAMES[3] in response.json()["detail"]
@@ -0,0 +1,31 @@
+import pytest
+
+from app.predict import load_model_dir
+
+ROW = [5.1, 3.5, 1.4, 0.2]
+
+
+@pytest.fixture
+def model(model_dir):
+    model = load_model_dir(model_dir, "lookup", processes=0)
+    yield model
+    model.close()
+
+
+def test_cached_results_are_copies(model):
+    first = model.predict_cached([ROW, ROW])
+    first[0][2]["setosa"] = -1.0
+
+    second = model.predict_cached([ROW])
+
+    assert model.cache.get_stats()["hits"] == 1
+    assert second[0][2]["setosa"] != -1.0
+    assert first[1][2]["setosa"] != -1.0
+    assert second == model.predict_batch([ROW])
+
+
+def test_batches_bypass_the_cache(model):
+    model.predict_batch([ROW] * 100)
+
+    stats = model.cache.get_stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (0, 0, 0)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from app.compiled import CHUNK_SIZE
+
+
+def test_probabilities_match_sklearn(forest, sklearn_model, probes):
+    np.testing.assert_allclose(forest.predict_proba(probes), sklearn_model.predict_proba(probes), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(probes), sklearn_model.predict(probes))
+
+
+def test_chunked_traversal_matches_single_pass(forest, probes):
+    X = probes[:2 * CHUNK_SIZE + 7].astype(np.float32)
+
+    chunked = forest.traverse(X)
+    row_by_row = np.concatenate([forest._apply_chunk(X[i:i + 1]) for i in range(len(X))])
+
+    np.testing.assert_array_equal(chunked, row_by_row)
+
+
+@pytest.mark.parametrize("X", [
+    np.zeros((2, 3)),
+    np.zeros(4),
+    np.array([[1.0, 2.0, np.nan, 0.2]]),
+    np.array([[1.0, np.inf, 1.4, 0.2]]),
+])
+def test_rejects_invalid_input(forest, X):
+    with pytest.raises(ValueError):
+        forest.predict_proba(X)
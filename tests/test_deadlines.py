@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from starlette.testclient import TestClient
+
+from app import config, deadlines
+from app.deadlines import Deadline, DeadlineExceeded, parse_timeout
+from app.main import app
+
+ROW = {"sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2}
+
+
+@pytest.fixture
+def model(active_model):
+    return active_model
+
+
+@pytest.fixture
+def client(active_model):
+    # No lifespan, so /predict runs on the executor without the batcher
+    return TestClient(app)
+
+
+def exceeded(path: str) -> float:
+    return deadlines.deadline_exceeded._values.get((path,), 0.0)
+
+
+@pytest.mark.parametrize("value,seconds", [("250", 0.25), ("250ms", 0.25), ("0.25s", 0.25), (" 2S ", 2.0)])
+def test_parse_timeout(value, seconds):
+    assert parse_timeout(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", ["soon", "0", "-5ms", ""])
+def test_malformed_header_is_rejected(client, value):
+    response = client.post("/predict", json=ROW, headers={"X-Request-Timeout": value})
+
+    assert response.status_code == 400
+    assert "X-Request-Timeout" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("path,body", [("/predict", ROW), ("/predict/batch", {"instances": [ROW] * 3})])
+def test_expired_deadline_returns_504(client, path, body):
+    before = exceeded(path)
+
+    response = client.post(path, json=body, headers={"X-Request-Timeout": "0.001ms"})
+
+    assert response.status_code == 504
+    assert "deadline exceeded" in response.json()["detail"]
+    assert exceeded(path) == before + 1
+
+
+def test_generous_deadline_is_answered(client):
+    response = client.post("/predict", json=ROW, headers={"X-Request-Timeout": "10s"})
+
+    assert response.status_code == 200
+    assert response.json()["predicted_class"] == "setosa"
+
+
+def test_chunked_inference_stops_partway(model, monkeypatch):
+    monkeypatch.setattr(config, "INFERENCE_CHUNK_ROWS", 10)
+    deadline = Deadline(60)
+    chunks = []
+    infer = model._infer
+
+    def counting_infer(X):
+        chunks.append(len(X))
+        if len(chunks) == 2:
+            deadline.expires_at = 0.0
+        return infer(X)
+
+    monkeypatch.setattr(model, "_infer", counting_infer)
+
+    with pytest.raises(DeadlineExceeded) as e:
+        model.infer(np.full((100, 4), 1.0), deadline)
+
+    assert e.value.stage == "inference"
+    assert chunks == [10, 10]
+
+
+def test_chunked_inference_without_expiry_matches_one_pass(model, monkeypatch):
+    X = np.random.default_rng(0).uniform(0, 8, (105, 4))
+    whole = model.infer(X)
+    monkeypatch.setattr(config, "INFERENCE_CHUNK_ROWS", 10)
+
+    chunked = model.infer(X, Deadline(60))
+
+    for a, b in zip(whole, chunked):
+        np.testing.assert_array_equal(a, b)
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.executor import InferenceExecutor, InferenceOverloaded
+
+
+def test_rejects_once_workers_and_queue_are_full():
+    async def scenario():
+        executor = InferenceExecutor(max_workers=1, max_queue=1)
+        release = threading.Event()
+        try:
+            running = asyncio.ensure_future(executor.run(release.wait))
+            queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+            await asyncio.sleep(0.05)
+
+            with pytest.raises(InferenceOverloaded):
+                await executor.run(lambda: "rejected")
+            stats = executor.get_stats()
+
+            release.set()
+            results = await asyncio.gather(running, queued)
+            # A slot frees up once work finishes
+            assert await executor.run(lambda: "after") == "after"
+            return stats, results, executor.get_stats()
+        finally:
+            release.set()
+            executor.shutdown()
+
+    full, results, drained = asyncio.run(scenario())
+    assert (full["pending"], full["rejected"]) == (2, 1)
+    assert results == [True, "queued"]
+    assert (drained["pending"], drained["rejected"]) == (0, 1)
+
+
+def test_cancelled_caller_keeps_its_slot_until_work_finishes():
+    async def scenario():
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+        release = threading.Event()
+        try:
+            running = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.05)
+            running.cancel()
+            await asyncio.sleep(0)
+
+            with pytest.raises(InferenceOverloaded):
+                await executor.run(lambda: None)
+
+            release.set()
+            while executor.get_stats()["pending"]:
+                await asyncio.sleep(0.01)
+            return await executor.run(lambda: "ran")
+        finally:
+            release.set()
+            executor.shutdown()
+
+    assert asyncio.run(scenario()) == "ran"
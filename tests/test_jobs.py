@@ -0,0 +1,91 @@
+import csv
+import json
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.jobs import JobManager
+from app.predict import model_service
+from app.schemas import FEATURE_NAMES
+
+# Output row n must answer input row n: rows 2 (unparseable), 3 (blank or
+# missing) and 4 (out of range) are invalid, and the rest keep their order
+ROWS = [[5.1, 3.5, 1.4, 0.2], None, None, [99.0, 3.0, 5.0, 1.5], [6.7, 3.0, 5.2, 2.3]]
+EXPECTED = ["setosa", None, None, None, "virginica"]
+
+
+def write_input(path, fmt):
+    if fmt == "csv":
+        lines = [",".join(FEATURE_NAMES), "5.1,3.5,1.4,0.2", "5.0,abc,1.4,0.2", "", "99,3.0,5.0,1.5", "6.7,3.0,5.2,2.3"]
+    elif fmt == "ndjson":
+        lines = ["[5.1, 3.5, 1.4, 0.2]", "[5.0, 3.4,", "", "[99, 3.0, 5.0, 1.5]", '{"sepal_length": 6.7, '
+                 '"sepal_width": 3.0, "petal_length": 5.2, "petal_width": 2.3}']
+    else:
+        columns = {name: [row[i] if row else None for row in ROWS] for i, name in enumerate(FEATURE_NAMES)}
+        pq.write_table(pa.table(columns), path)
+        return
+    path.write_text("\n".join(lines) + "\n")
+
+
+def read_output(path, fmt) -> list[tuple]:
+    if fmt == "csv":
+        with open(path, newline="") as f:
+            records = list(csv.DictReader(f))
+        return [(r["predicted_class"] or None, int(r["class_index"]), r["confidence"] or None) for r in records]
+    if fmt == "ndjson":
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+    else:
+        records = pq.read_table(path).to_pylist()
+    return [(r["predicted_class"] or None, r["class_index"], r["confidence"]) for r in records]
+
+
+@pytest.fixture
+def jobs(tmp_path, active_model):
+    manager = JobManager(model_service, tmp_path, workers=1, chunk_rows=2)
+    yield manager
+    manager.shutdown()
+
+
+def run(jobs, input_path, output_format):
+    job = jobs.submit(input_path, output_format=output_format)
+    deadline = time.monotonic() + 30
+    while job.finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.status == "completed", job.error
+    return job
+
+
+@pytest.mark.parametrize("input_format,output_format", [
+    ("csv", "csv"),
+    ("ndjson", "csv"),
+    ("parquet", "csv"),
+    ("csv", "ndjson"),
+    ("csv", "parquet"),
+])
+def test_invalid_and_blank_rows_keep_their_position(jobs, tmp_path, input_format, output_format):
+    input_path = tmp_path / f"input.{input_format}"
+    write_input(input_path, input_format)
+
+    job = run(jobs, input_path, output_format)
+    results = read_output(job.output_path, output_format)
+
+    assert (job.rows_done, job.rows_invalid) == (5, 3)
+    assert [label for label, _, _ in results] == EXPECTED
+    for (label, class_index, confidence) in results:
+        if label is None:
+            assert (class_index, confidence) == (-1, None)
+        else:
+            assert class_index >= 0 and float(confidence) > 0.5
+
+
+def test_csv_output_has_empty_scores_for_invalid_rows(jobs, tmp_path):
+    input_path = tmp_path / "input.csv"
+    write_input(input_path, "csv")
+
+    job = run(jobs, input_path, "csv")
+
+    invalid = job.output_path.read_text().splitlines()[2]
+    assert invalid == ",-1,,,,"
+    assert "nan" not in job.output_path.read_text()
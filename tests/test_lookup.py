@@ -0,0 +1,68 @@
+import logging
+
+import numpy as np
+import pytest
+
+from app.lookup import LOOKUP_FORMAT_VERSION, LOOKUP_PATH, LookupTable, load_or_compile
+from app.predict import MODEL_PATH
+
+
+@pytest.fixture(scope="module")
+def lookup(forest) -> LookupTable:
+    return LookupTable.compile(forest)
+
+
+def test_probabilities_match_sklearn(lookup, sklearn_model, probes):
+    np.testing.assert_allclose(lookup.predict_proba(probes), sklearn_model.predict_proba(probes), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(lookup.predict(probes), sklearn_model.predict(probes))
+
+
+def test_matches_forest_inside_every_sampled_cell(lookup, forest):
+    # Midpoints of random cells, plus their edges, evaluated by both engines
+    rng = np.random.default_rng(1)
+    edges = [np.concatenate([[t[0] - 1.0], t, [t[-1] + 1.0]]) for t in lookup.thresholds]
+    coords = [rng.integers(1, len(e), 20000) for e in edges]
+    midpoints = np.column_stack([(e[c - 1] + e[c]) / 2 for e, c in zip(edges, coords)])
+    upper_edges = np.column_stack([e[c] for e, c in zip(edges, coords)])
+    X = np.concatenate([midpoints, upper_edges])
+
+    np.testing.assert_array_equal(lookup.predict_proba(X), forest.predict_proba(X))
+
+
+def test_matches_sklearn_on_measurement_grid(lookup, sklearn_model):
+    # Iris measurements arrive at 0.1 cm resolution
+    X = np.random.default_rng(2).integers(0, 101, (100000, 4)) / 10
+
+    np.testing.assert_allclose(lookup.predict_proba(X), sklearn_model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_save_and_load_round_trip(lookup, tmp_path):
+    path = tmp_path / "lookup.npz"
+    lookup.save(path, "abc123")
+
+    loaded, info = LookupTable.load(path)
+
+    assert info == {"format_version": LOOKUP_FORMAT_VERSION, "model_sha256": "abc123"}
+    for saved, restored in zip(lookup.thresholds, loaded.thresholds):
+        np.testing.assert_array_equal(saved, restored)
+    np.testing.assert_array_equal(loaded.index, lookup.index)
+    np.testing.assert_array_equal(loaded.table, lookup.table)
+    np.testing.assert_array_equal(loaded.classes_, lookup.classes_)
+
+
+def test_stale_table_is_recompiled(lookup, model_dir, tmp_path, caplog):
+    stale = tmp_path / "stale.npz"
+    lookup.save(stale, "0" * 64)
+
+    with caplog.at_level(logging.WARNING, logger="app.lookup"):
+        recompiled = load_or_compile(model_dir / MODEL_PATH.name, stale)
+
+    assert "does not match" in caplog.text
+    np.testing.assert_array_equal(recompiled.table, lookup.table)
+
+
+def test_current_table_is_loaded(model_dir, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.lookup"):
+        load_or_compile(model_dir / MODEL_PATH.name, model_dir / LOOKUP_PATH.name)
+
+    assert caplog.text == ""
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from app.predict import BACKENDS, load_model_dir
+
+
+def test_argmax_of_predict_proba_matches_predict(sklearn_model, probes):
+    labels = sklearn_model.classes_.take(sklearn_model.predict_proba(probes).argmax(axis=1))
+
+    np.testing.assert_array_equal(labels, sklearn_model.predict(probes))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_matches_sklearn(model_dir, sklearn_model, probes, backend):
+    model = load_model_dir(model_dir, backend, processes=0)
+    try:
+        predictions, confidences, probabilities = model.infer(probes)
+    finally:
+        model.close()
+
+    expected = sklearn_model.predict_proba(probes)
+    np.testing.assert_array_equal(predictions, sklearn_model.predict(probes))
+    np.testing.assert_allclose(probabilities, expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(confidences, expected.max(axis=1), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_single_row_matches_batch(model_dir, probes, backend):
+    model = load_model_dir(model_dir, backend, processes=0)
+    try:
+        batch = model.predict_batch(probes[:50].tolist())
+        single = [model.predict_batch([row])[0] for row in probes[:50].tolist()]
+    finally:
+        model.close()
+
+    assert single == batch
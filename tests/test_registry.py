@@ -0,0 +1,86 @@
+import asyncio
+import shutil
+
+import pytest
+
+from app.registry import ModelNotFound, ModelRegistry
+
+
+@pytest.fixture
+def root(tmp_path, model_dir):
+    for name in ("a", "b", "c"):
+        shutil.copytree(model_dir, tmp_path / name)
+    for version in ("v2", "v9", "v10"):
+        shutil.copytree(model_dir, tmp_path / "versioned" / version)
+    return tmp_path
+
+
+def registry(root, models_in_budget: float) -> ModelRegistry:
+    # Budget in units of one model's estimated memory
+    probe = ModelRegistry(root, memory_budget=0, backend="compiled", processes=0)
+    size = asyncio.run(probe.get("a")).memory_bytes()
+    probe.close()
+    return ModelRegistry(root, memory_budget=int(size * models_in_budget), backend="compiled", processes=0)
+
+
+def test_concurrent_requests_share_one_load(root):
+    models = registry(root, 10)
+
+    async def scenario():
+        return await asyncio.gather(*(models.get("a") for _ in range(8)))
+
+    loaded = asyncio.run(scenario())
+
+    assert all(model is loaded[0] for model in loaded)
+    assert (models.loads, models.get_stats()["loading"]) == (1, [])
+    asyncio.run(models.get("a"))
+    assert (models.loads, models.hits) == (1, 1)
+
+
+def test_evicts_least_recently_used_over_budget(root):
+    models = registry(root, 2.5)
+
+    async def scenario():
+        a = await models.get("a")
+        b = await models.get("b")
+        await models.get("a")
+        await models.get("c")
+        return a, b
+
+    a, b = asyncio.run(scenario())
+
+    assert models.get_stats()["loaded"] == ["a", "c"]
+    assert models.evictions == 1
+    assert b._closed and not a._closed
+    assert models.memory_used() <= models.memory_budget
+
+
+def test_evicted_model_stays_open_while_leased(root):
+    models = registry(root, 1.5)
+
+    async def scenario():
+        a = await models.acquire("a")
+        await models.get("b")
+        assert models.get_stats()["loaded"] == ["b"]
+        assert not a._closed
+        a.release()
+        return a
+
+    assert asyncio.run(scenario())._closed
+
+
+def test_versions_resolve_in_natural_order_and_can_be_pinned(root):
+    models = registry(root, 10)
+
+    assert models.resolve("versioned")[1] == "v10"
+    assert models.resolve("versioned", "v9")[1] == "v9"
+    assert models.available()[-1] == {"name": "versioned", "versions": ["v2", "v9", "v10"], "loaded": []}
+
+    asyncio.run(models.get("versioned", "v9"))
+    assert models.get_stats()["loaded"] == ["versioned@v9"]
+
+
+@pytest.mark.parametrize("name,version", [("missing", None), ("versioned", "v3"), ("../a", None), ("a", "..")])
+def test_unknown_or_invalid_names_are_not_found(root, name, version):
+    with pytest.raises(ModelNotFound):
+        registry(root, 10).resolve(name, version)
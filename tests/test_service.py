@@ -0,0 +1,72 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app import config
+from app.executor import InferenceExecutor
+from app.predict import ModelUnavailable, load_model_dir, model_service
+from app.reload import ModelReloader
+
+X = np.array([[5.1, 3.5, 1.4, 0.2]])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(model_service, "_active", None)
+    yield model_service
+    model_service.close()
+
+
+def test_lease_without_a_model_raises(service):
+    with pytest.raises(ModelUnavailable):
+        with service.lease():
+            pass
+
+
+def test_close_lets_leases_finish_then_refuses_new_ones(service, model_dir):
+    service.swap(load_model_dir(model_dir, "compiled", processes=0))
+
+    with service.lease() as model:
+        service.close()
+        assert not service.is_loaded()
+        assert model.score(X)[0][0] == "setosa"
+        assert not model._closed
+    assert model._closed
+
+    with pytest.raises(ModelUnavailable):
+        with service.lease():
+            pass
+
+
+def test_lease_on_a_closed_active_model_raises(service, model_dir):
+    model = load_model_dir(model_dir, "compiled", processes=0)
+    service.swap(model)
+    model.close()
+
+    with pytest.raises(ModelUnavailable):
+        with service.lease():
+            pass
+
+
+def test_lease_held_across_a_reload_keeps_the_old_model(service, model_dir, monkeypatch):
+    monkeypatch.setattr(config, "WARMUP_ENABLED", False)
+    monkeypatch.setattr(service, "load_candidate", lambda: load_model_dir(model_dir, "compiled", processes=0))
+    service.swap(load_model_dir(model_dir, "compiled", processes=1))
+    reloader = ModelReloader(service, InferenceExecutor(max_workers=1, max_queue=0))
+
+    with service.lease() as old:
+        result = asyncio.run(reloader.reload(force=True))
+        assert result["reloaded"]
+
+        # New requests get the new version; the old one keeps working, on
+        # its own worker process, for as long as the lease is held
+        with service.lease() as new:
+            assert new is not old
+        worker = old.engine._workers[0].process
+        assert old.score(X)[0][0] == "setosa"
+        assert worker.is_alive() and not old._closed
+
+    assert old._closed
+    worker.join(timeout=5)
+    assert not worker.is_alive()
@@ -0,0 +1,62 @@
+import asyncio
+import shutil
+
+import pytest
+
+from app.predict import model_service
+from app.registry import ModelRegistry
+from app.shadow import ShadowScorer
+
+ROW = [5.1, 3.5, 1.4, 0.2]
+
+
+@pytest.fixture
+def registry(tmp_path, model_dir):
+    shutil.copytree(model_dir, tmp_path / "candidate")
+    registry = ModelRegistry(tmp_path, memory_budget=1 << 30, backend="compiled", processes=0)
+    yield registry
+    registry.close()
+
+
+def shadow(registry, **kwargs) -> ShadowScorer:
+    return ShadowScorer(model_service, registry, "candidate", fraction=1.0, max_busy=0, **kwargs)
+
+
+def test_compares_both_models_per_row(active_model, registry):
+    scorer = shadow(registry)
+
+    async def scenario():
+        await scorer.start()
+        try:
+            results = active_model.predict_batch([ROW] * 10)
+            scorer.submit([ROW] * 10, results)
+            while scorer.stats.rows < 10:
+                await asyncio.sleep(0.01)
+        finally:
+            await scorer.stop()
+
+    asyncio.run(scenario())
+    stats = scorer.get_stats()
+
+    assert (stats["requests"], stats["rows"], stats["failures"]) == (1, 10, 0)
+    assert stats["agreement_rate"] == 1.0 and stats["max_divergence"] == 0.0
+    assert stats["primary_ms_per_row"]["p50"] is not None
+    assert stats["shadow_ms_per_row"]["p50"] is not None
+
+
+def test_queue_is_bounded_in_rows(active_model, registry):
+    scorer = shadow(registry, batch_size=4, queue_rows=10)
+    results = active_model.predict_batch([ROW] * 100)
+
+    async def scenario():
+        await scorer.start()
+        # The worker cannot run until this coroutine yields
+        for _ in range(5):
+            scorer.submit([ROW] * 100, results)
+        queued = scorer.get_stats()["queued_rows"]
+        await scorer.stop()
+        return queued
+
+    # Each batch is sampled down to 4 rows; the third would pass 10
+    assert asyncio.run(scenario()) == 8
+    assert scorer.stats.dropped == 3
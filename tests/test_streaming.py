@@ -0,0 +1,51 @@
+import pytest
+
+from app.streaming import parse_lines
+
+
+def test_parses_arrays_and_objects_in_order():
+    lines = [
+        b"[5.1, 3.5, 1.4, 0.2]",
+        b'{"sepal_length": 6.7, "sepal_width": 3.0, "petal_length": 5.2, "petal_width": 2.3}',
+        b"",
+        b"[6, 3, 4, 1]\r",
+    ]
+
+    assert parse_lines(lines, 1) == [
+        (1, [5.1, 3.5, 1.4, 0.2], None),
+        (2, [6.7, 3.0, 5.2, 2.3], None),
+        (4, [6, 3, 4, 1], None),
+    ]
+
+
+def test_malformed_line_cannot_pair_up_with_its_neighbour():
+    # Joined into one array these decode as exactly two elements
+    entries = parse_lines([b"[1,2,3,4],[[1,2,3,4]", b"[5,5,5,5]]", b"[4,3,2,1]"], 1)
+
+    assert [(line, features) for line, features, _ in entries] == [(1, None), (2, None), (3, [4, 3, 2, 1])]
+    assert all(error for _, _, error in entries[:2])
+
+
+@pytest.mark.parametrize("line", [
+    b"[1, 2, 3, true]",
+    b'[1, 2, 3, "4"]',
+    b"[1, 2, 3, [4]]",
+    b"[1, 2, 3, null]",
+    b'{"sepal_length": 1, "sepal_width": 2, "petal_length": 3, "petal_width": false}',
+])
+def test_rejects_non_numeric_features(line):
+    assert parse_lines([b"[1, 2, 3, 4]", line], 1)[1] == (2, None, "Features must be numbers")
+
+
+@pytest.mark.parametrize("line", [b"[1, 2, 3]", b"[1, 2, 3, 4, 5]", b"4", b'"row"'])
+def test_rejects_wrong_shape(line):
+    _, features, error = parse_lines([line], 7)[0]
+
+    assert features is None
+    assert error.startswith("Row must be")
+
+
+def test_missing_object_features_are_named():
+    _, _, error = parse_lines([b'{"sepal_length": 1, "sepal_width": 2, "petal_length": 3}'], 1)[0]
+
+    assert error == "Missing features: ['petal_width']"
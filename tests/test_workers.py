@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from app.workers import WorkerPool
+
+
+@pytest.fixture(scope="module")
+def pool(forest):
+    # Small slots so the probes are split across both workers
+    pool = WorkerPool(forest, processes=2, max_rows=512).start()
+    yield pool
+    pool.close()
+
+
+def test_probabilities_match_sklearn(pool, sklearn_model, probes):
+    np.testing.assert_allclose(pool.predict_proba(probes), sklearn_model.predict_proba(probes), rtol=0, atol=1e-12)
+
+
+def test_dead_worker_is_restarted(pool, forest, probes):
+    restarts = pool.restarts
+    for worker in pool._workers:
+        worker.process.kill()
+        worker.process.join()
+
+    X = probes[:1000]
+    np.testing.assert_array_equal(pool.predict_proba(X), forest.predict_proba(X))
+    assert pool.restarts == restarts + 2
+    assert all(worker.process.is_alive() for worker in pool._workers)
+
+
+def test_rejects_wrong_feature_count(pool):
+    with pytest.raises(ValueError, match="Expected input of shape"):
+        pool.predict_proba(np.zeros((3, 5)))
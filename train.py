@@ -1,11 +1,16 @@
+import argparse
 import joblib
 from sklearn.datasets import load_iris
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import numpy as np
+from pathlib import Path
 
-def train_model():
+from app.compiled import FOREST_PATH, CompiledForest
+from app.lookup import LOOKUP_PATH, LookupTable, file_digest
+
+def train_model(n_estimators: int = 100, max_depth: int = 5, output_dir: Path = Path("model")):
     print("Loading Iris dataset...")
     iris = load_iris()
     X, y = iris.data, iris.target
@@ -23,8 +28,8 @@ def train_model():
     
     print("\nTraining RandomForest classifier...")
     model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=5,
+        n_estimators=n_estimators,
+        max_depth=max_depth,
         random_state=42,
         n_jobs=-1
     )
@@ -38,7 +43,8 @@ def train_model():
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred, target_names=iris.target_names))
     
-    model_path = "model/iris_model.joblib"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model_path = str(output_dir / "iris_model.joblib")
     print(f"\nSaving model to {model_path}...")
     joblib.dump(model, model_path)
     
@@ -49,10 +55,21 @@ def train_model():
         "n_features": len(iris.feature_names)
     }
     
-    metadata_path = "model/metadata.joblib"
+    metadata_path = str(output_dir / "metadata.joblib")
     joblib.dump(metadata, metadata_path)
     print(f"Saving metadata to {metadata_path}...")
     
+    forest_path = output_dir / FOREST_PATH.name
+    forest = CompiledForest.from_sklearn(model)
+    print(f"Saving memory-mappable forest to {forest_path}...")
+    forest.save(forest_path, file_digest(Path(model_path)))
+    
+    lookup_path = output_dir / LOOKUP_PATH.name
+    print(f"Compiling lookup table to {lookup_path}...")
+    lookup = LookupTable.compile(forest)
+    lookup.save(lookup_path, file_digest(Path(model_path)))
+    print(f"Lookup cells: {lookup.index.size} ({len(lookup.table)} distinct outputs)")
+    
     print("\nModel training complete!")
     print(f"Model file size: {joblib.load(model_path).__sizeof__()} bytes")
     
@@ -65,7 +82,22 @@ def train_model():
     print(f"Input features: {sample[0]}")
     print(f"Predicted class: {iris.target_names[prediction]}")
     print(f"Probabilities: {dict(zip(iris.target_names, probabilities))}")
+    
+    single_pass = model.classes_.take(model.predict_proba(X).argmax(axis=1))
+    parity = np.array_equal(single_pass, model.predict(X))
+    print(f"Single-pass argmax matches predict(): {parity}")
     print("="*50)
+    
+    if not parity:
+        raise RuntimeError("argmax(predict_proba) disagrees with predict(); serving labels would drift")
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the iris RandomForest and write its serving artifacts")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=5)
+    parser.add_argument(
+        "--output-dir", type=Path, default=Path("model"),
+        help="Where to write the artifacts; use models/<name> for the model registry"
+    )
+    args = parser.parse_args()
+    train_model(args.n_estimators, args.max_depth, args.output_dir)